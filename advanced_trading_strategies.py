@@ -12,18 +12,246 @@ Date: 2025
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
+_PLOTTING = None
+
+def _import_plotting():
+    """Import matplotlib/seaborn on first use, not at module load."""
+    global _PLOTTING
+    if _PLOTTING is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        _PLOTTING = (plt, sns)
+    return _PLOTTING
+
+_KERNELS = {}
+
+def _kernel(func, fallback=None):
+    """Return func compiled with numba if it is installed, otherwise fallback (default func itself)."""
+    if func not in _KERNELS:
+        try:
+            from numba import njit
+            _KERNELS[func] = njit(cache=True)(func)
+        except ImportError:
+            _KERNELS[func] = fallback or func
+    return _KERNELS[func]
+
+_ACTIONS = np.array(['HOLD', 'BUY', 'SELL'])
+
+def _contrarian_positions(sentiment, position, fear_threshold, greed_threshold, step, max_position, min_position):
+    """Step the contrarian position through each day; actions are 0=HOLD, 1=BUY, 2=SELL."""
+    n = len(sentiment)
+    positions = np.empty(n)
+    actions = np.zeros(n, dtype=np.int8)
+    action = 0
+    for i in range(n):
+        if sentiment[i] <= fear_threshold:
+            if position < max_position:
+                position += step
+                action = 1
+        elif sentiment[i] >= greed_threshold:
+            if position > min_position:
+                position -= step
+                action = 2
+        else:
+            action = 0
+        positions[i] = position
+        actions[i] = action
+    return positions, actions
+
+def _momentum_positions(momentum, position, threshold, step, max_position, min_position):
+    """Step the clamped momentum position through each day; actions are 0=HOLD, 1=BUY, 2=SELL."""
+    n = len(momentum)
+    positions = np.empty(n)
+    actions = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        if momentum[i] < -threshold:
+            position = min(max_position, position + step)
+            actions[i] = 1
+        elif momentum[i] > threshold:
+            position = max(min_position, position - step)
+            actions[i] = 2
+        positions[i] = position
+    return positions, actions
+
+# (stop loss, take profit) fractions recommended for each sentiment band
+_RISK_LEVELS = {
+    'fear': (0.15, 0.50),     # sentiment <= 30
+    'greed': (0.06, 0.20),    # sentiment >= 70
+    'neutral': (0.10, 0.30),
+}
+
+def _risk_levels(sentiment):
+    """Return stop-loss and take-profit fractions for an array of sentiment scores."""
+    sentiment = np.asarray(sentiment, dtype=float)
+    bands = [sentiment <= 30, sentiment >= 70]
+    stop_loss = np.select(bands, [_RISK_LEVELS['fear'][0], _RISK_LEVELS['greed'][0]], _RISK_LEVELS['neutral'][0])
+    take_profit = np.select(bands, [_RISK_LEVELS['fear'][1], _RISK_LEVELS['greed'][1]], _RISK_LEVELS['neutral'][1])
+    return stop_loss, take_profit
+
+# Primary key of exported stop-rule trades: the entry fill's identity. The ID
+# columns are always present (empty when a file lacks them) so every run
+# upserts into the same schema.
+STOP_RULE_KEY = ['account', 'coin', 'entry_time', 'entry_transaction_hash', 'entry_order_id', 'entry_trade_id']
+
+def _stop_rule_exits(tape_prices, entry_pos, exit_pos, sides, stop_losses, take_profits):
+    """
+    Scan each trade's price tape for the first stop-loss or take-profit hit.
+
+    Trade i is entered at tape_prices[entry_pos[i]] and actually exited at
+    exit_pos[i]; outcomes are 0=held to actual exit, 1=stopped, 2=took profit.
+    """
+    n = len(entry_pos)
+    exit_index = exit_pos.copy()
+    outcomes = np.zeros(n, dtype=np.int8)
+    for i in range(n):
+        entry_price = tape_prices[entry_pos[i]]
+        for j in range(entry_pos[i] + 1, exit_pos[i]):
+            move = sides[i] * (tape_prices[j] / entry_price - 1.0)
+            if move <= -stop_losses[i]:
+                exit_index[i] = j
+                outcomes[i] = 1
+                break
+            if move >= take_profits[i]:
+                exit_index[i] = j
+                outcomes[i] = 2
+                break
+    return exit_index, outcomes
+
+_EXIT_BLOCK = 64
+
+def _first_breach(tape_prices, starts, stops, entry_prices, sides, stop_losses, take_profits, width):
+    """
+    Find each trade's first SL/TP breach in tape_prices[starts:stops], segments at most width long.
+
+    Returns the breach position (-1 if none) and outcome (1=stopped, 2=took profit).
+    """
+    n = len(starts)
+    positions = np.full(n, -1, dtype=np.int64)
+    outcomes = np.zeros(n, dtype=np.int8)
+    offsets = np.arange(width)
+    chunk = max(1, (1 << 22) // width)
+    for lo in range(0, n, chunk):
+        rows = slice(lo, lo + chunk)
+        pos = starts[rows, None] + offsets
+        valid = pos < stops[rows, None]
+        prices = tape_prices[np.minimum(pos, len(tape_prices) - 1)]
+        move = sides[rows, None] * (prices / entry_prices[rows, None] - 1.0)
+        stopped = valid & (move <= -stop_losses[rows, None])
+        hit = stopped | (valid & (move >= take_profits[rows, None]))
+        first = hit.argmax(axis=1)
+        found = hit[np.arange(len(first)), first]
+        positions[rows] = np.where(found, pos[np.arange(len(first)), first], -1)
+        outcomes[rows] = np.where(found, np.where(stopped[np.arange(len(first)), first], 1, 2), 0)
+    return positions, outcomes
+
+def _stop_rule_exits_numpy(tape_prices, entry_pos, exit_pos, sides, stop_losses, take_profits):
+    """
+    Vectorized _stop_rule_exits for when numba is unavailable, with identical results.
+
+    The tape is cut into blocks of _EXIT_BLOCK prices with a sparse table of
+    block minima/maxima. move is monotone in price for a fixed entry, so a
+    block holds a breach exactly when its min or max price does. Each trade
+    scans its partial first block, binary-lifts over whole blocks to the
+    first breaching one, then scans that block: O((n + m) log n) overall
+    instead of O(sum of holding lengths).
+    """
+    n = len(entry_pos)
+    exit_index = exit_pos.copy()
+    outcomes = np.zeros(n, dtype=np.int8)
+    if n == 0:
+        return exit_index, outcomes
+    entry_prices = tape_prices[entry_pos]
+    starts = entry_pos + 1
+    
+    # Head: up to the first block boundary after the entry
+    first_block = -(-starts // _EXIT_BLOCK)
+    head, head_outcomes = _first_breach(tape_prices, starts, np.minimum(exit_pos, first_block * _EXIT_BLOCK),
+                                        entry_prices, sides, stop_losses, take_profits, _EXIT_BLOCK)
+    done = head >= 0
+    exit_index[done] = head[done]
+    outcomes[done] = head_outcomes[done]
+    
+    # Sparse tables of NaN-ignoring block minima/maxima; level k covers 2**k blocks
+    n_blocks = -(-len(tape_prices) // _EXIT_BLOCK)
+    padded = np.full(n_blocks * _EXIT_BLOCK, np.nan)
+    padded[:len(tape_prices)] = tape_prices
+    padded = padded.reshape(n_blocks, _EXIT_BLOCK)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN blocks
+        mins, maxs = [np.nanmin(padded, axis=1)], [np.nanmax(padded, axis=1)]
+    while 2 ** len(mins) <= n_blocks:
+        half = 2 ** (len(mins) - 1)
+        mins.append(np.fmin(mins[-1][:-half], mins[-1][half:]))
+        maxs.append(np.fmax(maxs[-1][:-half], maxs[-1][half:]))
+    
+    # Whole blocks before the exit's block: advance past every block without a breach
+    todo = np.flatnonzero(~done)
+    current = first_block[todo]
+    last_block = exit_pos[todo] // _EXIT_BLOCK
+    side, entry_price = sides[todo], entry_prices[todo]
+    low_price = np.where(side > 0, 1, 0)
+    for level in range(len(mins) - 1, -1, -1):
+        span = 2 ** level
+        can = np.flatnonzero(current + span <= last_block)
+        if not len(can):
+            continue
+        blocks = current[can]
+        low, high = mins[level][blocks], maxs[level][blocks]
+        # Smallest and largest move over the span: a long's comes from the min/max price, a short's the reverse
+        worst = side[can] * (np.where(low_price[can], low, high) / entry_price[can] - 1.0)
+        best = side[can] * (np.where(low_price[can], high, low) / entry_price[can] - 1.0)
+        clear = ~((worst <= -stop_losses[todo][can]) | (best >= take_profits[todo][can]))
+        current[can[clear]] += span
+    
+    # Tail: the breaching block, or the partial block holding the actual exit
+    tail_start = np.maximum(current * _EXIT_BLOCK, starts[todo])
+    tail, tail_outcomes = _first_breach(
+        tape_prices, tail_start, np.minimum(exit_pos[todo], current * _EXIT_BLOCK + _EXIT_BLOCK),
+        entry_price, side, stop_losses[todo], take_profits[todo], _EXIT_BLOCK)
+    found = tail >= 0
+    exit_index[todo[found]] = tail[found]
+    outcomes[todo[found]] = tail_outcomes[found]
+    return exit_index, outcomes
+
+def _notional_drawdown(pnl, notional):
+    """Largest peak-to-trough fall of cumulative PnL, as a % of notional traded."""
+    if notional <= 0 or len(pnl) == 0:
+        return 0.0
+    curve = np.concatenate([[0.0], np.cumsum(pnl)]) / notional * 100
+    return (curve - np.maximum.accumulate(curve)).min()
+
+def _portfolio_values(initial_capital, portfolio_returns):
+    """Accumulate daily returns onto the initial capital in the same order as a running sum."""
+    return np.cumsum(np.concatenate([[float(initial_capital)], portfolio_returns]))[1:]
+
 class AdvancedTradingStrategies:
-    def __init__(self, merged_data):
-        """Initialize with merged sentiment and trading data."""
+    def __init__(self, merged_data, fear_greed_data=None):
+        """
+        Initialize with merged sentiment and trading data.
+
+        fear_greed_data is the full Fear/Greed history (fear_greed_index.csv);
+        regime labels and fill-level sentiment lookups use it instead of the
+        merged trading days, which have multi-month gaps.
+        """
         self.data = merged_data.copy()
+        if fear_greed_data is not None:
+            fear_greed_data = fear_greed_data.copy()
+            fear_greed_data['date'] = pd.to_datetime(fear_greed_data['date'])
+            if 'sentiment_score' not in fear_greed_data:
+                fear_greed_data['sentiment_score'] = fear_greed_data['value']
+            # Same duplicate-date handling as the analyzer's validation stage
+            fear_greed_data = fear_greed_data.drop_duplicates('date', keep='last')
+            fear_greed_data = fear_greed_data.sort_values('date', kind='stable').reset_index(drop=True)
+        self.fear_greed_data = fear_greed_data
         self.strategies = {}
         self.results = {}
+        self.stop_rule_trades = None
+        self.stop_rule_results = None
+        self.stop_rule_accounts = None
         
     def contrarian_strategy(self, initial_capital=100000):
         """
@@ -32,44 +260,27 @@ class AdvancedTradingStrategies:
         """
         print("Implementing Contrarian Strategy...")
         
-        # Initialize portfolio
-        portfolio_value = initial_capital
-        position_size = 0
-        trades = []
-        
-        for idx, row in self.data.iterrows():
-            sentiment = row['sentiment_score']
-            daily_pnl = row['total_pnl']
-            
-            # Contrarian logic
-            if sentiment <= 30:  # Fear territory
-                # Increase position (buy more)
-                if position_size < 0.8:  # Max 80% allocation
-                    position_size += 0.1
-                    action = "BUY"
-            elif sentiment >= 70:  # Greed territory
-                # Decrease position (sell)
-                if position_size > 0.2:  # Min 20% allocation
-                    position_size -= 0.1
-                    action = "SELL"
-            else:
-                action = "HOLD"
-            
-            # Calculate portfolio performance
-            portfolio_return = (daily_pnl / 1000000) * position_size  # Normalized
-            portfolio_value += portfolio_return
-            
-            trades.append({
-                'date': row['date'],
-                'sentiment': sentiment,
-                'action': action,
-                'position_size': position_size,
-                'daily_pnl': daily_pnl,
-                'portfolio_value': portfolio_value,
-                'portfolio_return': portfolio_return
-            })
-        
-        strategy_df = pd.DataFrame(trades)
+        sentiment = self.data['sentiment_score'].values.astype(float)
+        daily_pnl = self.data['total_pnl'].values.astype(float)
+        
+        # Position depends on the previous day's position, so step it in a (JIT-compiled) kernel:
+        # buy 10% in fear territory up to 80%, sell 10% in greed territory down to 20%
+        position_size, actions = _kernel(_contrarian_positions)(sentiment, 0.0, 30.0, 70.0, 0.1, 0.8, 0.2)
+        
+        # Calculate portfolio performance
+        portfolio_return = (daily_pnl / 1000000) * position_size  # Normalized
+        portfolio_values = _portfolio_values(initial_capital, portfolio_return)
+        portfolio_value = portfolio_values[-1] if len(portfolio_values) else initial_capital
+        
+        strategy_df = pd.DataFrame({
+            'date': self.data['date'].values,
+            'sentiment': self.data['sentiment_score'].values,
+            'action': _ACTIONS[actions],
+            'position_size': position_size,
+            'daily_pnl': daily_pnl,
+            'portfolio_value': portfolio_values,
+            'portfolio_return': portfolio_return
+        })
         self.strategies['contrarian'] = strategy_df
         
         # Calculate performance metrics
@@ -103,43 +314,28 @@ class AdvancedTradingStrategies:
         self.data['sentiment_ma5'] = self.data['sentiment_score'].rolling(window=5).mean()
         self.data['sentiment_momentum'] = self.data['sentiment_score'] - self.data['sentiment_ma5']
         
-        portfolio_value = initial_capital
-        position_size = 0.5  # Start with 50% allocation
-        trades = []
-        
-        for idx, row in self.data.iterrows():
-            if pd.isna(row['sentiment_momentum']):
-                continue
-                
-            momentum = row['sentiment_momentum']
-            daily_pnl = row['total_pnl']
-            
-            # Momentum logic
-            if momentum < -5:  # Sentiment declining (fear increasing)
-                position_size = min(0.8, position_size + 0.1)
-                action = "BUY"
-            elif momentum > 5:  # Sentiment rising (greed increasing)
-                position_size = max(0.2, position_size - 0.1)
-                action = "SELL"
-            else:
-                action = "HOLD"
-            
-            # Calculate performance
-            portfolio_return = (daily_pnl / 1000000) * position_size
-            portfolio_value += portfolio_return
-            
-            trades.append({
-                'date': row['date'],
-                'sentiment': row['sentiment_score'],
-                'momentum': momentum,
-                'action': action,
-                'position_size': position_size,
-                'daily_pnl': daily_pnl,
-                'portfolio_value': portfolio_value,
-                'portfolio_return': portfolio_return
-            })
-        
-        strategy_df = pd.DataFrame(trades)
+        valid = self.data[self.data['sentiment_momentum'].notna()]
+        momentum = valid['sentiment_momentum'].values.astype(float)
+        daily_pnl = valid['total_pnl'].values.astype(float)
+        
+        # Start with 50% allocation; buy on declining sentiment, sell on rising, clamped to 20-80%
+        position_size, actions = _kernel(_momentum_positions)(momentum, 0.5, 5.0, 0.1, 0.8, 0.2)
+        
+        # Calculate performance
+        portfolio_return = (daily_pnl / 1000000) * position_size
+        portfolio_values = _portfolio_values(initial_capital, portfolio_return)
+        portfolio_value = portfolio_values[-1] if len(portfolio_values) else initial_capital
+        
+        strategy_df = pd.DataFrame({
+            'date': valid['date'].values,
+            'sentiment': valid['sentiment_score'].values,
+            'momentum': momentum,
+            'action': _ACTIONS[actions],
+            'position_size': position_size,
+            'daily_pnl': daily_pnl,
+            'portfolio_value': portfolio_values,
+            'portfolio_return': portfolio_return
+        })
         self.strategies['momentum'] = strategy_df
         
         # Calculate performance metrics
@@ -237,6 +433,70 @@ class AdvancedTradingStrategies:
         
         return strategy_df
     
+    def regime_strategy(self, initial_capital=100000, n_regimes=3):
+        """
+        Implement regime-conditioned strategy based on detected sentiment regimes.
+        Allocate most in the fearful regime and least in the greedy one.
+        """
+        print("Implementing Sentiment Regime Strategy...")
+        
+        if 'regime' not in self.data:
+            # Label the full Fear/Greed history exactly as the analyzer does, then align to trading days
+            if self.fear_greed_data is None:
+                raise ValueError("regime_strategy needs a 'regime' column or the full Fear/Greed series "
+                                 "(pass fear_greed_data to AdvancedTradingStrategies)")
+            from bitcoin_sentiment_analysis import label_sentiment_regimes
+            _, regimes, regime_probability = label_sentiment_regimes(
+                self.fear_greed_data['date'].values, self.fear_greed_data['sentiment_score'].values, n_regimes)
+            labels = pd.DataFrame({'regime': regimes, 'regime_probability': regime_probability},
+                                  index=self.fear_greed_data['date'])
+            self.data['regime'] = self.data['date'].map(labels['regime'])
+            self.data['regime_probability'] = self.data['date'].map(labels['regime_probability'])
+        
+        # Regime 0 is the most fearful: scale allocation from 80% down to 20% across all K regimes
+        if self.data['regime'].notna().any():
+            n_regimes = max(n_regimes, int(np.nanmax(self.data['regime'].values)) + 1)
+        allocations = np.linspace(0.8, 0.2, n_regimes)
+        # Days without a regime label get the neutral midpoint allocation
+        position_size = np.where(self.data['regime'].notna(),
+                                 allocations[self.data['regime'].fillna(0).astype(int).values], 0.5)
+        
+        portfolio_return = (self.data['total_pnl'].values / 1000000) * position_size
+        portfolio_value = _portfolio_values(initial_capital, portfolio_return)
+        
+        strategy_df = pd.DataFrame({
+            'date': self.data['date'].values,
+            'sentiment': self.data['sentiment_score'].values,
+            'regime': self.data['regime'].values,
+            'position_size': position_size,
+            'daily_pnl': self.data['total_pnl'].values,
+            'portfolio_value': portfolio_value,
+            'portfolio_return': portfolio_return
+        })
+        self.strategies['regime'] = strategy_df
+        final_value = portfolio_value[-1] if len(portfolio_value) else initial_capital
+        
+        # Calculate performance metrics
+        total_return = (final_value - initial_capital) / initial_capital * 100
+        volatility = strategy_df['portfolio_return'].std() * np.sqrt(252)
+        sharpe_ratio = (strategy_df['portfolio_return'].mean() * 252) / volatility if volatility > 0 else 0
+        
+        self.results['regime'] = {
+            'total_return': total_return,
+            'volatility': volatility,
+            'sharpe_ratio': sharpe_ratio,
+            'final_value': final_value,
+            'max_drawdown': self._calculate_max_drawdown(strategy_df['portfolio_value'])
+        }
+        
+        print(f"Sentiment Regime Strategy Results:")
+        print(f"  Total Return: {total_return:.2f}%")
+        print(f"  Volatility: {volatility:.2f}%")
+        print(f"  Sharpe Ratio: {sharpe_ratio:.2f}")
+        print(f"  Max Drawdown: {self.results['regime']['max_drawdown']:.2f}%")
+        
+        return strategy_df
+    
     def _calculate_max_drawdown(self, portfolio_values):
         """Calculate maximum drawdown."""
         peak = portfolio_values.expanding().max()
@@ -267,6 +527,7 @@ class AdvancedTradingStrategies:
     def create_strategy_visualizations(self):
         """Create visualizations for all strategies."""
         print("\nCreating strategy visualizations...")
+        plt, _ = _import_plotting()
         
         fig, axes = plt.subplots(2, 2, figsize=(16, 12))
         
@@ -335,6 +596,194 @@ class AdvancedTradingStrategies:
         
         print("Strategy visualizations saved as 'advanced_trading_strategies.png'")
     
+    def simulate_stop_rules(self, fills):
+        """
+        Backtest sentiment-dependent stop-loss / take-profit rules on fill-level data.
+
+        Fills are deduplicated on the same composite key as the analyzer's
+        validation stage. Every 'Open Long' / 'Open Short' fill is a trade
+        held until the account's next closing fill on that coin. The coin's
+        Execution Price tape is replayed in time order, and the trade exits at
+        the first price that breaches the stop-loss or take-profit recommended
+        for that day's sentiment. Returns and drawdowns are measured against
+        notional traded, overall and per account.
+        """
+        from bitcoin_sentiment_analysis import DEDUP_KEY, find_duplicate_fills
+        
+        print("Simulating Stop-Loss / Take-Profit Rules...")
+        
+        duplicates = find_duplicate_fills(fills)
+        fills = fills[~duplicates].reset_index(drop=True)
+        dedup_skipped = not any(col in fills for col in DEDUP_KEY if col != 'Account')
+        
+        timestamps = fills['Timestamp']
+        if not pd.api.types.is_datetime64_any_dtype(timestamps):
+            timestamps = pd.to_datetime(timestamps, unit='ms')
+        if 'date' in fills:
+            dates = pd.to_datetime(fills['date'])
+        else:
+            dates = pd.to_datetime(fills['Timestamp IST'], format='%d-%m-%Y %H:%M').dt.normalize()
+        prices = pd.to_numeric(fills['Execution Price'], errors='coerce').values.astype(float)
+        size_usd = pd.to_numeric(fills['Size USD'], errors='coerce').fillna(0).values.astype(float)
+        # Classify the handful of distinct Direction values, not every fill
+        direction_codes, directions = pd.factorize(fills['Direction'].astype(str))
+        directions = pd.Index(directions)
+        opens = np.asarray(directions.str.startswith('Open'), dtype=bool)[direction_codes]
+        closes = np.asarray(directions.str.startswith('Close') | directions.str.contains('>', regex=False),
+                            dtype=bool)[direction_codes]
+        shorts = np.asarray(directions.str.contains('Short', regex=False), dtype=bool)[direction_codes]
+        
+        # Build the price tape: all fills sorted by coin, then time
+        coin_codes, _ = pd.factorize(fills['Coin'])
+        time_values = timestamps.values.astype('datetime64[ns]').astype(np.int64)
+        order = np.lexsort((time_values, coin_codes))
+        tape_pos = np.empty(len(order), dtype=np.int64)
+        tape_pos[order] = np.arange(len(order))
+        tape_prices = prices[order]
+        coin_end = np.searchsorted(coin_codes[order], coin_codes, side='right') - 1
+        
+        # Match each entry to the next closing fill of the same account and coin
+        group_codes = fills.groupby(['Account', 'Coin'], sort=False).ngroup().values.astype(np.int64)
+        is_entry = opens & ~np.isnan(prices)
+        is_close = closes
+        close_keys = np.sort(group_codes[is_close] * len(order) + tape_pos[is_close])
+        entry_keys = group_codes[is_entry] * len(order) + tape_pos[is_entry]
+        match = np.searchsorted(close_keys, entry_keys, side='right')
+        match_keys = close_keys[np.minimum(match, max(len(close_keys) - 1, 0))] if len(close_keys) else entry_keys
+        has_close = (match < len(close_keys)) & (match_keys // len(order) == group_codes[is_entry])
+        entry_pos = tape_pos[is_entry]
+        exit_pos = np.where(has_close, match_keys % len(order), coin_end[is_entry])
+        
+        sides = np.where(shorts[is_entry], -1.0, 1.0)
+        # Prefer the full Fear/Greed history; the merged trading days have multi-month gaps
+        sentiment_source = self.fear_greed_data if self.fear_greed_data is not None else self.data
+        sentiment_by_date = sentiment_source.drop_duplicates('date', keep='last').set_index('date')['sentiment_score']
+        sentiment = dates[is_entry].map(sentiment_by_date).values.astype(float)
+        # Entries without a sentiment reading fall back to the neutral band
+        stop_losses, take_profits = _risk_levels(sentiment)
+        
+        rule_exit_pos, outcomes = _kernel(_stop_rule_exits, _stop_rule_exits_numpy)(
+            tape_prices, entry_pos, exit_pos, sides, stop_losses, take_profits)
+        
+        entry_prices = tape_prices[entry_pos]
+        # The entry fill's identity keys each trade for incremental exports; missing IDs become ''
+        # rather than NULL, which SQLite never matches on conflict
+        entry_ids = {}
+        for col in DEDUP_KEY[1:]:
+            ids = fills[col][is_entry] if col in fills else pd.Series('', index=np.flatnonzero(is_entry))
+            if ids.isna().any():
+                ids = ids.astype(object).where(ids.notna(), '')
+            entry_ids[f"entry_{col.lower().replace(' ', '_')}"] = ids.values
+        trades = pd.DataFrame({
+            'entry_time': timestamps.values[is_entry],
+            'account': fills['Account'].values[is_entry],
+            'coin': fills['Coin'].values[is_entry],
+            **entry_ids,
+            'side': np.where(sides > 0, 'LONG', 'SHORT'),
+            'sentiment': sentiment,
+            'stop_loss': stop_losses,
+            'take_profit': take_profits,
+            'size_usd': size_usd[is_entry],
+            'entry_price': entry_prices,
+            'actual_exit_time': timestamps.values[order][exit_pos],
+            'actual_exit_price': tape_prices[exit_pos],
+            'rule_exit_time': timestamps.values[order][rule_exit_pos],
+            'rule_exit_price': tape_prices[rule_exit_pos],
+            'outcome': np.array(['HELD', 'STOP_LOSS', 'TAKE_PROFIT'])[outcomes],
+        })
+        trades['actual_pnl'] = sides * (trades['actual_exit_price'] / entry_prices - 1) * trades['size_usd']
+        trades['rule_pnl'] = sides * (trades['rule_exit_price'] / entry_prices - 1) * trades['size_usd']
+        self.stop_rule_trades = trades
+        
+        # Cumulative PnL as a % of notional traded, in the order each trade's PnL is realized
+        notional = trades['size_usd'].sum()
+        results = {}
+        for label, pnl_col, time_col in [('actual', 'actual_pnl', 'actual_exit_time'),
+                                         ('rules', 'rule_pnl', 'rule_exit_time')]:
+            order = np.argsort(trades[time_col].values, kind='stable')
+            pnl = np.nan_to_num(trades[pnl_col].values[order])
+            results[label] = {
+                'total_pnl': pnl.sum(),
+                'return_on_notional': pnl.sum() / notional * 100 if notional > 0 else 0.0,
+                'max_drawdown': _notional_drawdown(pnl, notional)
+            }
+        results['trades'] = len(trades)
+        results['notional'] = notional
+        results['duplicate_fills_dropped'] = int(duplicates.sum())
+        results['dedup_skipped'] = dedup_skipped
+        results['entries_without_sentiment'] = int(np.isnan(sentiment).sum())
+        results['stop_losses_hit'] = int((outcomes == 1).sum())
+        results['take_profits_hit'] = int((outcomes == 2).sum())
+        self.stop_rule_results = results
+        self.stop_rule_accounts = self._stop_rule_account_summary(trades, outcomes)
+        
+        print(f"Stop-Loss / Take-Profit Simulation Results ({len(trades):,} trades):")
+        if dedup_skipped:
+            print("  Warning: fills have no Transaction Hash / Order ID / Trade ID; not deduplicated")
+        print(f"  Duplicate Fills Dropped: {results['duplicate_fills_dropped']:,}, "
+              f"Entries Without Sentiment (neutral levels used): {results['entries_without_sentiment']:,}")
+        print(f"  Stops Hit: {results['stop_losses_hit']:,}, Take Profits Hit: {results['take_profits_hit']:,}")
+        print(f"  Notional Traded: ${notional:,.2f}")
+        for label in ['actual', 'rules']:
+            print(f"  {label.title():7} Total PnL: ${results[label]['total_pnl']:,.2f}, "
+                  f"Return on Notional: {results[label]['return_on_notional']:.2f}%, "
+                  f"Max Drawdown: {results[label]['max_drawdown']:.2f}% of notional")
+        
+        return trades
+    
+    def _stop_rule_account_summary(self, trades, outcomes):
+        """Per-account notional, PnL, return on notional and max drawdown, actual vs rules."""
+        account_codes, accounts = pd.factorize(trades['account'])
+        n_accounts = len(accounts)
+        notional = np.bincount(account_codes, weights=trades['size_usd'].values, minlength=n_accounts)
+        summary = pd.DataFrame({
+            'account': accounts,
+            'trades': np.bincount(account_codes, minlength=n_accounts),
+            'notional': notional,
+            'stop_losses_hit': np.bincount(account_codes[outcomes == 1], minlength=n_accounts),
+            'take_profits_hit': np.bincount(account_codes[outcomes == 2], minlength=n_accounts),
+        })
+        scale = np.divide(100, notional, out=np.zeros(n_accounts), where=notional > 0)
+        for label, pnl_col, time_col in [('actual', 'actual_pnl', 'actual_exit_time'),
+                                         ('rules', 'rule_pnl', 'rule_exit_time')]:
+            order = np.lexsort((trades[time_col].values.astype('datetime64[ns]').view(np.int64), account_codes))
+            codes = account_codes[order]
+            pnl = np.nan_to_num(trades[pnl_col].values[order])
+            cumulative = pd.Series(pnl).groupby(codes).cumsum()
+            # Peak starts at zero PnL, so an account that only loses still shows a drawdown
+            peak = cumulative.groupby(codes).cummax().clip(lower=0)
+            drawdown = np.zeros(n_accounts)
+            np.minimum.at(drawdown, codes, (cumulative - peak).values)
+            total = np.bincount(codes, weights=pnl, minlength=n_accounts)
+            summary[f'{label}_pnl'] = total
+            summary[f'{label}_return_on_notional'] = total * scale
+            summary[f'{label}_max_drawdown'] = drawdown * scale
+        return summary
+    
+    def export_results(self, db_path='/Users/sohamajmera/Desktop/primetradetask/analysis_results.db'):
+        """Upsert per-day strategy trades and summary results into an SQLite file."""
+        from bitcoin_sentiment_analysis import export_to_sqlite
+        
+        print(f"\nExporting strategy results to {db_path}...")
+        
+        trades = pd.concat(
+            [strategy_df.assign(strategy=strategy_name) for strategy_name, strategy_df in self.strategies.items()],
+            ignore_index=True
+        )
+        results = pd.DataFrame(self.results).T.rename_axis('strategy').reset_index()
+        tables = [
+            ('strategy_trades', trades, ['strategy', 'date'], ['date']),
+            ('strategy_results', results, ['strategy'], []),
+        ]
+        if self.stop_rule_trades is not None:
+            # Keyed on the entry fill's identity so incremental runs upsert the same trades
+            tables.append(('stop_rule_trades', self.stop_rule_trades, STOP_RULE_KEY, ['entry_time', 'account']))
+            tables.append(('stop_rule_accounts', self.stop_rule_accounts, ['account'], []))
+        
+        export_to_sqlite(db_path, tables)
+        
+        print("Export completed.")
+    
     def generate_trading_signals(self):
         """Generate actionable trading signals based on analysis."""
         print("\n" + "="*60)
@@ -388,19 +837,20 @@ class AdvancedTradingStrategies:
         
         # Risk management recommendations
         print(f"\n⚠️  RISK MANAGEMENT:")
+        stop_loss, take_profit = _risk_levels(current_sentiment)
         if current_sentiment <= 30:
-            print(f"   • Stop Loss: 15% (Fear periods allow wider stops)")
-            print(f"   • Take Profit: 50% (High profit potential)")
+            print(f"   • Stop Loss: {stop_loss:.0%} (Fear periods allow wider stops)")
+            print(f"   • Take Profit: {take_profit:.0%} (High profit potential)")
         elif current_sentiment >= 70:
-            print(f"   • Stop Loss: 6% (Tight risk control)")
-            print(f"   • Take Profit: 20% (Quick profit taking)")
+            print(f"   • Stop Loss: {stop_loss:.0%} (Tight risk control)")
+            print(f"   • Take Profit: {take_profit:.0%} (Quick profit taking)")
         else:
-            print(f"   • Stop Loss: 10% (Standard risk management)")
-            print(f"   • Take Profit: 30% (Balanced approach)")
+            print(f"   • Stop Loss: {stop_loss:.0%} (Standard risk management)")
+            print(f"   • Take Profit: {take_profit:.0%} (Balanced approach)")
         
         return signals
     
-    def run_complete_analysis(self):
+    def run_complete_analysis(self, fills=None):
         """Run complete advanced trading strategy analysis."""
         print("🚀 Starting Advanced Trading Strategy Analysis")
         print("="*60)
@@ -409,6 +859,7 @@ class AdvancedTradingStrategies:
         self.contrarian_strategy()
         self.sentiment_momentum_strategy()
         self.risk_parity_strategy()
+        self.regime_strategy()
         
         # Compare strategies
         comparison = self.compare_strategies()
@@ -419,13 +870,21 @@ class AdvancedTradingStrategies:
         # Generate trading signals
         signals = self.generate_trading_signals()
         
+        # Backtest the recommended stop-loss / take-profit levels on fills
+        if fills is not None:
+            self.simulate_stop_rules(fills)
+        
+        # Export results for dashboard queries
+        self.export_results()
+        
         print("\n✅ Advanced trading strategy analysis completed!")
         
         return {
             'strategies': self.strategies,
             'results': self.results,
             'comparison': comparison,
-            'signals': signals
+            'signals': signals,
+            'stop_rules': self.stop_rule_results
         }
 
 def main():
@@ -439,11 +898,25 @@ def main():
         print("Merged data not found. Please run the main analysis first.")
         return None
     
+    try:
+        # Fill-level data for the stop-loss / take-profit simulation
+        fills = pd.read_csv('/Users/sohamajmera/Desktop/primetradetask/historical_data.csv')
+    except FileNotFoundError:
+        print("Historical trader data not found. Skipping stop-loss / take-profit simulation.")
+        fills = None
+    
+    try:
+        # Full Fear/Greed history for regime labels and fill-level sentiment
+        fear_greed_data = pd.read_csv('/Users/sohamajmera/Desktop/primetradetask/fear_greed_index.csv')
+    except FileNotFoundError:
+        print("Fear/Greed data not found. Regime strategy needs regime labels in the merged data.")
+        fear_greed_data = None
+    
     # Initialize advanced strategies
-    strategies = AdvancedTradingStrategies(merged_data)
+    strategies = AdvancedTradingStrategies(merged_data, fear_greed_data)
     
     # Run complete analysis
-    results = strategies.run_complete_analysis()
+    results = strategies.run_complete_analysis(fills=fills)
     
     return results
 
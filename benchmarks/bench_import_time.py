@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Import-Time Benchmark
+=====================
+
+Imports each analysis module in a fresh interpreter, reports how long the
+import took and checks that the plotting stack was not loaded.
+
+Usage: python benchmarks/bench_import_time.py [repeats]
+"""
+
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ['bitcoin_sentiment_analysis', 'advanced_trading_strategies']
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+assert 'matplotlib' not in sys.modules, 'matplotlib imported at module load'
+assert 'seaborn' not in sys.modules, 'seaborn imported at module load'
+print(elapsed)
+"""
+
+def time_import(module):
+    """Import module in a fresh interpreter and return the import time in seconds."""
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module)],
+        cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return float(result.stdout.strip())
+
+def main():
+    """Main execution function."""
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    print(f"Import time over {repeats} fresh interpreters (matplotlib/seaborn must stay unloaded)")
+    for module in MODULES:
+        times = sorted(time_import(module) for _ in range(repeats))
+        print(f"  {module:30} best {times[0] * 1000:7.1f} ms, median {times[len(times) // 2] * 1000:7.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Strategy Kernel Benchmark
+=========================
+
+Times the contrarian and sentiment-momentum strategies three ways: the
+original iterrows loop, the array kernel run as plain Python over NumPy
+arrays (the fallback without numba) and the numba-compiled kernel. The
+stop-loss / take-profit exit scan is timed as the plain Python loop, the
+vectorized NumPy fallback and the numba-compiled loop.
+
+The plain loop is skipped above 100,000 fills.
+
+Usage: python benchmarks/bench_strategy_kernels.py [n_days] [n_fills]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, 'tests'))
+
+import advanced_trading_strategies as ats
+from reference_strategies import contrarian_iterrows, momentum_iterrows
+
+STRATEGIES = [
+    ('contrarian', 'contrarian_strategy', contrarian_iterrows, ats._contrarian_positions),
+    ('momentum', 'sentiment_momentum_strategy', momentum_iterrows, ats._momentum_positions),
+]
+
+def best_time(func, repeats=3):
+    """Return the best wall time of func over repeats runs, with its output suppressed."""
+    times = []
+    for _ in range(repeats):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    """Main execution function."""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    sentiment = rng.integers(0, 101, n)
+    sentiment[0] = 50
+    data = pd.DataFrame({
+        'date': pd.date_range('2018-02-01', periods=n),
+        'sentiment_score': sentiment,
+        'total_pnl': rng.normal(0, 1e5, n),
+    })
+    
+    try:
+        from numba import njit
+    except ImportError:
+        njit = None
+    
+    print(f"Strategy timings over {n:,} days (best of 3)")
+    print(f"  {'strategy':12} {'iterrows':>10} {'numpy':>10} {'numba':>10}")
+    for name, method, reference, kernel in STRATEGIES:
+        run = lambda: getattr(ats.AdvancedTradingStrategies(data), method)()
+        iterrows_time = best_time(lambda: reference(data), repeats=1)
+        
+        ats._KERNELS[kernel] = kernel
+        numpy_time = best_time(run)
+        
+        numba_time = None
+        if njit is not None:
+            ats._KERNELS[kernel] = njit(cache=True)(kernel)
+            best_time(run, repeats=1)  # compile outside the timed runs
+            numba_time = best_time(run)
+        
+        numba_text = f"{numba_time:9.3f}s" if numba_time is not None else f"{'n/a':>10}"
+        print(f"  {name:12} {iterrows_time:9.3f}s {numpy_time:9.3f}s {numba_text}")
+    
+    n_fills = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    args = stop_rule_trades(n_fills)
+    print(f"\nStop-rule exit scan over {n_fills:,} fills, {len(args[1]):,} entries")
+    print(f"  {'python loop':>12} {'numpy':>10} {'numba':>10}")
+    # The plain loop is O(sum of holding lengths); only time it on small tapes
+    loop_time = best_time(lambda: ats._stop_rule_exits(*args), repeats=1) if n_fills <= 100_000 else None
+    numpy_time = best_time(lambda: ats._stop_rule_exits_numpy(*args))
+    numba_text = f"{'n/a':>10}"
+    if njit is not None:
+        compiled = njit(cache=True)(ats._stop_rule_exits)
+        compiled(*args)
+        numba_text = f"{best_time(lambda: compiled(*args)):9.3f}s"
+    loop_text = f"{loop_time:11.3f}s" if loop_time is not None else f"{'skipped':>12}"
+    print(f"  {loop_text} {numpy_time:9.3f}s {numba_text}")
+
+def stop_rule_trades(n_fills, seed=0):
+    """Random-walk price tape with half the fills entering, a fifth of those never closed."""
+    rng = np.random.default_rng(seed)
+    tape_prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n_fills)))
+    entry_pos = np.flatnonzero(rng.random(n_fills) < 0.5)
+    holding = np.where(rng.random(len(entry_pos)) < 0.2, n_fills, rng.geometric(1 / 500, len(entry_pos)))
+    exit_pos = np.minimum(entry_pos + holding, n_fills - 1)
+    stop_losses, take_profits = ats._risk_levels(rng.integers(0, 101, len(entry_pos)))
+    sides = rng.choice([-1.0, 1.0], len(entry_pos))
+    return tape_prices, entry_pos, exit_pos, sides, stop_losses, take_profits
+
+if __name__ == "__main__":
+    main()
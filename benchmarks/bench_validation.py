@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Validation Overhead Benchmark
+=============================
+
+Times loading plus preprocessing of synthetic fills, and the share of that
+spent in validate_historical_data. The validation stage must add less than
+10% to ingest time.
+
+Usage: python benchmarks/bench_validation.py [n_fills]
+"""
+
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bitcoin_sentiment_analysis import BitcoinSentimentAnalyzer
+
+BUDGET = 0.10
+
+def write_fills(path, n, duplicate_fraction=0.001, seed=0):
+    """Write n synthetic fills (with a few exact duplicates) in the historical_data.csv layout."""
+    rng = np.random.default_rng(seed)
+    ts = np.sort(rng.integers(pd.Timestamp('2023-01-01').value // 10**6, pd.Timestamp('2025-01-01').value // 10**6, n))
+    ist = pd.to_datetime(ts, unit='ms') + pd.Timedelta(hours=5, minutes=30)
+    fills = pd.DataFrame({
+        'Account': rng.choice([f'0x{i:040x}' for i in range(500)], n),
+        'Coin': rng.choice(['BTC', 'ETH', 'SOL'], n),
+        'Execution Price': rng.lognormal(8, 1, n),
+        'Size Tokens': rng.random(n),
+        'Size USD': rng.random(n) * 1000,
+        'Side': rng.choice(['BUY', 'SELL'], n),
+        'Timestamp IST': ist.strftime('%d-%m-%Y %H:%M'),
+        'Start Position': 0.0,
+        'Direction': rng.choice(['Open Long', 'Close Long', 'Open Short', 'Close Short'], n),
+        'Closed PnL': rng.normal(0, 50, n),
+        'Transaction Hash': pd.Series(np.arange(n)).map('0x{:064x}'.format),
+        'Order ID': rng.integers(0, 10**10, n),
+        'Crossed': True,
+        'Fee': rng.random(n),
+        'Trade ID': rng.integers(0, 10**15, n),
+        'Timestamp': ts,
+    })
+    duplicates = fills.sample(frac=duplicate_fraction, random_state=seed)
+    pd.concat([fills, duplicates]).sort_values('Timestamp', kind='stable').to_csv(path, index=False)
+
+def main():
+    """Main execution function."""
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'historical_data.csv')
+        print(f"Writing {n:,} synthetic fills...")
+        write_fills(path, n)
+        
+        analyzer = BitcoinSentimentAnalyzer(os.path.join(REPO_ROOT, 'fear_greed_index.csv'), path)
+        validate = analyzer.validate_historical_data
+        timings = {}
+        
+        def timed_validate(**kwargs):
+            start = time.perf_counter()
+            result = validate(**kwargs)
+            timings['validate'] = time.perf_counter() - start
+            return result
+        analyzer.validate_historical_data = timed_validate
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            analyzer.historical_data = pd.read_csv(path)
+            analyzer.preprocess_historical_data()
+            total = time.perf_counter() - start
+    
+    overhead = timings['validate'] / (total - timings['validate'])
+    report = analyzer.validation_report['historical']
+    print(f"Load + preprocess: {total:.2f} s, validation: {timings['validate']:.2f} s "
+          f"({overhead:.1%} added to ingest, budget {BUDGET:.0%})")
+    print(f"Duplicates dropped: {report['duplicate_fills_dropped']:,}")
+    if overhead >= BUDGET:
+        sys.exit(f"Validation overhead {overhead:.1%} exceeds the {BUDGET:.0%} budget")
+
+if __name__ == "__main__":
+    main()
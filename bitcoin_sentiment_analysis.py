@@ -13,14 +13,272 @@ Date: 2025
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sqlite3
 from datetime import datetime, timedelta
 import warnings
 warnings.filterwarnings('ignore')
 
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+_PLOTTING = None
+
+def _import_plotting():
+    """Import and style matplotlib/seaborn on first use, not at module load."""
+    global _PLOTTING
+    if _PLOTTING is None:
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        _PLOTTING = (plt, sns)
+    return _PLOTTING
+
+_POPCOUNT = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def _account_bitmaps(day_codes, account_codes, n_days, n_accounts):
+    """Build a packed (n_days, ceil(n_accounts / 8)) bitmap of accounts active per day."""
+    valid = (day_codes >= 0) & (account_codes >= 0)
+    day_codes = day_codes[valid]
+    account_codes = account_codes[valid]
+    bitmaps = np.zeros((n_days, (n_accounts + 7) // 8), dtype=np.uint8)
+    bits = (np.uint8(0x80) >> (account_codes & 7).astype(np.uint8)).astype(np.uint8)
+    np.bitwise_or.at(bitmaps, (day_codes, account_codes >> 3), bits)
+    return bitmaps
+
+def _bitmap_cardinality(bitmaps):
+    """Count set bits along the last axis of a packed bitmap."""
+    return _POPCOUNT[bitmaps].sum(axis=-1, dtype=np.int64)
+
+def _splitmix64(values):
+    """Hash integer codes to well-mixed 64-bit values."""
+    x = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+def _hll_registers(day_codes, account_codes, n_days, precision=12):
+    """Build one HyperLogLog sketch (a row of 2**precision registers) per day."""
+    if not 4 <= precision <= 16:
+        raise ValueError(f"HyperLogLog precision must be between 4 and 16, got {precision}")
+    valid = (day_codes >= 0) & (account_codes >= 0)
+    hashes = _splitmix64(account_codes[valid])
+    buckets = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+    # Rank = position of the leftmost 1-bit in the low 32 bits (33 if all zero).
+    low_bits = (hashes & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    ranks = np.where(low_bits > 0, 32 - np.floor(np.log2(np.maximum(low_bits, 1))), 33).astype(np.uint8)
+    registers = np.zeros((n_days, 1 << precision), dtype=np.uint8)
+    np.maximum.at(registers, (day_codes[valid], buckets), ranks)
+    return registers
+
+def _hll_estimate(registers):
+    """Estimate cardinality from HyperLogLog registers along the last axis."""
+    m = registers.shape[-1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.sum(np.exp2(-registers.astype(np.float64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    # Linear counting is more accurate while many registers are still empty.
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+_DISTINCT_METHODS = {
+    'exact': (np.bitwise_or, _bitmap_cardinality),
+    'hll': (np.maximum, _hll_estimate),
+}
+
+DEDUP_KEY = ('Account', 'Transaction Hash', 'Order ID', 'Trade ID')
+
+def find_duplicate_fills(fills, dedup_key=DEDUP_KEY, account_codes=None):
+    """
+    Return a boolean mask of fills repeating an earlier fill on dedup_key.
+
+    Key columns missing from fills are skipped. If none of the fill-identity
+    columns (every key column except 'Account') are present, nothing is
+    flagged: an account alone does not identify a fill. Pass account_codes
+    (from pd.factorize(fills['Account'])) to reuse an existing factorization.
+    """
+    key = [col for col in dedup_key if col in fills.columns]
+    if not any(col != 'Account' for col in key):
+        return np.zeros(len(fills), dtype=bool)
+    if 'Account' in key and account_codes is None:
+        account_codes = pd.factorize(fills['Account'])[0]
+    
+    # Only rows colliding on a hash of the integer part of the key (account code, IDs)
+    # can be duplicates, so the full key with its string columns is compared for those alone.
+    integer_key = [account_codes if col == 'Account' else fills[col].values
+                   for col in key if col == 'Account' or pd.api.types.is_integer_dtype(fills[col])]
+    duplicates = np.zeros(len(fills), dtype=bool)
+    if integer_key:
+        mixed = np.zeros(len(fills), dtype=np.uint64)
+        for values in integer_key:
+            mixed = _splitmix64(mixed ^ values.astype(np.int64).view(np.uint64))
+        candidates = pd.Series(mixed).duplicated(keep=False).values
+        if candidates.any():
+            duplicates[candidates] = fills.loc[candidates, key].duplicated().values
+    elif key:
+        duplicates = fills.duplicated(subset=key).values
+    return duplicates
+
+def _sqlite_type(series):
+    """Map a pandas column dtype to an SQLite column type."""
+    if pd.api.types.is_bool_dtype(series) or pd.api.types.is_integer_dtype(series):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(series):
+        return 'REAL'
+    return 'TEXT'
+
+def _sqlite_rows(frame):
+    """Convert a DataFrame to SQLite-ready tuples (ISO dates, None for missing)."""
+    frame = frame.copy()
+    for col in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[col]):
+            values = frame[col]
+            present = values.dropna()
+            if (present == present.dt.normalize()).all():
+                frame[col] = values.dt.strftime('%Y-%m-%d')
+            elif (present == present.dt.floor('s')).all():
+                frame[col] = values.dt.strftime('%Y-%m-%d %H:%M:%S')
+            else:
+                # Keep sub-second precision so fill timestamps stay usable as keys
+                frame[col] = values.dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+        elif pd.api.types.is_bool_dtype(frame[col]):
+            frame[col] = frame[col].astype(int)
+    frame = frame.astype(object).where(frame.notna(), None)
+    return list(frame.itertuples(index=False, name=None))
+
+def export_to_sqlite(db_path, tables):
+    """
+    Bulk-upsert DataFrames into an SQLite file.
+
+    tables is a list of (name, frame, key_columns, index_columns). Each table
+    gets a primary key on key_columns so re-running the pipeline updates rows
+    in place, plus secondary indexes for dashboard queries. Columns added by
+    newer runs are appended to existing tables.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute('PRAGMA journal_mode=WAL')
+        with conn:
+            for name, frame, key_columns, index_columns in tables:
+                columns = list(frame.columns)
+                quoted = [f'"{col}"' for col in columns]
+                keys = ', '.join(f'"{col}"' for col in key_columns)
+                column_defs = ', '.join(f'"{col}" {_sqlite_type(frame[col])}' for col in columns)
+                conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" ({column_defs}, PRIMARY KEY ({keys}))')
+                
+                existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{name}")')}
+                for col in columns:
+                    if col not in existing:
+                        conn.execute(f'ALTER TABLE "{name}" ADD COLUMN "{col}" {_sqlite_type(frame[col])}')
+                for col in index_columns:
+                    conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{name}_{col}" ON "{name}" ("{col}")')
+                
+                updates = ', '.join(f'{q} = excluded.{q}' for col, q in zip(columns, quoted) if col not in key_columns)
+                conflict = f'DO UPDATE SET {updates}' if updates else 'DO NOTHING'
+                conn.executemany(
+                    f'INSERT INTO "{name}" ({", ".join(quoted)}) VALUES ({", ".join("?" * len(columns))}) '
+                    f'ON CONFLICT ({keys}) {conflict}',
+                    _sqlite_rows(frame)
+                )
+                print(f"  {name}: {len(frame)} rows")
+    finally:
+        conn.close()
+
+class SentimentRegimeFilter:
+    """
+    Online Gaussian HMM forward filter over Fear/Greed readings.
+
+    Regimes start ordered by mean sentiment, so regime 0 is the most fearful.
+    Each update costs O(K^2) for K regimes and also folds the reading into
+    running per-regime mean/variance estimates (weighted by the regime
+    probabilities), so the label for day t only depends on readings up to t
+    and new readings extend the filter without refitting on the full history.
+    """
+    
+    def __init__(self, means, stds, stay_probability=0.97, prior_weight=30.0, learn=True):
+        """
+        Initialize with per-regime emission parameters and regime persistence.
+
+        The initial parameters count as prior_weight readings per regime in
+        the running estimates; learn=False keeps them fixed.
+        """
+        order = np.argsort(means)
+        self.means = np.asarray(means, dtype=float)[order]
+        self.stds = np.asarray(stds, dtype=float)[order]
+        n_regimes = len(self.means)
+        if n_regimes < 2:
+            raise ValueError("SentimentRegimeFilter needs at least two regimes")
+        self.transition = np.full((n_regimes, n_regimes), (1 - stay_probability) / (n_regimes - 1))
+        np.fill_diagonal(self.transition, stay_probability)
+        self.state_probs = np.full(n_regimes, 1 / n_regimes)
+        self.learn = learn
+        self._weights = np.full(n_regimes, float(prior_weight))
+        self._sums = self.means * prior_weight
+        self._squares = (self.stds ** 2 + self.means ** 2) * prior_weight
+    
+    @classmethod
+    def from_scale(cls, n_regimes=3, low=0.0, high=100.0, stay_probability=0.97, prior_weight=30.0):
+        """Start from equal-width bands of the index scale, without looking at any readings."""
+        edges = np.linspace(low, high, n_regimes + 1)
+        means = (edges[:-1] + edges[1:]) / 2
+        stds = np.diff(edges) / np.sqrt(12)
+        return cls(means, stds, stay_probability, prior_weight)
+    
+    @classmethod
+    def from_history(cls, values, n_regimes=3, stay_probability=0.97, prior_weight=30.0):
+        """Estimate regime means/stds from equal-count quantile bands of a burn-in history."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        edges = np.quantile(values, np.linspace(0, 1, n_regimes + 1))
+        bands = np.searchsorted(edges[1:-1], values, side='right')
+        means = np.array([values[bands == k].mean() if np.any(bands == k) else edges[k:k + 2].mean()
+                          for k in range(n_regimes)])
+        stds = np.array([max(values[bands == k].std(), 1.0) if np.any(bands == k) else 1.0
+                         for k in range(n_regimes)])
+        return cls(means, stds, stay_probability, prior_weight)
+    
+    def update(self, value):
+        """Fold one reading into the filter and return the regime probabilities."""
+        predicted = self.state_probs @ self.transition
+        if not np.isnan(value):
+            # Work in log space so readings far from every mean cannot underflow.
+            log_likelihood = -0.5 * ((value - self.means) / self.stds) ** 2 - np.log(self.stds)
+            predicted = predicted * np.exp(log_likelihood - log_likelihood.max())
+        self.state_probs = predicted / predicted.sum()
+        if self.learn and not np.isnan(value):
+            # Expanding-window mean/variance per regime, weighted by this reading's regime probabilities
+            self._weights += self.state_probs
+            self._sums += self.state_probs * value
+            self._squares += self.state_probs * value * value
+            self.means = self._sums / self._weights
+            self.stds = np.sqrt(np.maximum(self._squares / self._weights - self.means ** 2, 1.0))
+        return self.state_probs
+    
+    def filter(self, values):
+        """Run update over a series and return an (n, K) array of regime probabilities."""
+        values = np.asarray(values, dtype=float)
+        probs = np.empty((len(values), len(self.means)))
+        for i, value in enumerate(values):
+            probs[i] = self.update(value)
+        return probs
+
+def label_sentiment_regimes(dates, scores, n_regimes=3, stay_probability=0.97):
+    """
+    Filter a sentiment history in date order with an online SentimentRegimeFilter.
+
+    The filter starts from equal-width bands of the 0-100 index and learns
+    its regime parameters as it goes, so each day's label uses only that day
+    and earlier readings. Returns the filter plus regime labels and
+    probabilities aligned with the input rows, so callers sharing a series
+    get identical labels.
+    """
+    order = np.argsort(np.asarray(dates), kind='stable')
+    ordered_scores = np.asarray(scores, dtype=float)[order]
+    regime_filter = SentimentRegimeFilter.from_scale(n_regimes, stay_probability=stay_probability)
+    probs = regime_filter.filter(ordered_scores)
+    
+    regimes = np.empty(len(order), dtype=int)
+    regime_probability = np.empty(len(order))
+    regimes[order] = probs.argmax(axis=1)
+    regime_probability[order] = probs.max(axis=1)
+    return regime_filter, regimes, regime_probability
 
 class BitcoinSentimentAnalyzer:
     def __init__(self, fear_greed_path, historical_data_path):
@@ -30,6 +288,9 @@ class BitcoinSentimentAnalyzer:
         self.fear_greed_data = None
         self.historical_data = None
         self.merged_data = None
+        self.distinct_sketches = None
+        self.regime_filter = None
+        self.validation_report = {}
         
     def load_data(self):
         """Load and preprocess the datasets."""
@@ -67,9 +328,58 @@ class BitcoinSentimentAnalyzer:
         
         self.fear_greed_data['sentiment_score'] = self.fear_greed_data['value']
         
+        self.validate_fear_greed_data()
+        
         print("Fear/Greed data preprocessing completed.")
         return self.fear_greed_data
     
+    def validate_fear_greed_data(self):
+        """Drop duplicate sentiment dates and record gaps in the daily series."""
+        dates = self.fear_greed_data['date']
+        duplicates = dates.duplicated(keep='last')
+        self.fear_greed_data = self.fear_greed_data[~duplicates].reset_index(drop=True)
+        
+        days = np.sort(self.fear_greed_data['date'].dropna().values.astype('datetime64[D]'))
+        steps = np.diff(days).astype(np.int64)
+        gap_ends = np.flatnonzero(steps > 1)
+        gaps = pd.DataFrame({
+            'last_reading': pd.to_datetime(days[gap_ends]),
+            'next_reading': pd.to_datetime(days[gap_ends + 1]),
+            'missing_days': steps[gap_ends] - 1
+        })
+        
+        self.validation_report['fear_greed'] = {
+            'rows': len(dates),
+            'duplicate_dates_dropped': int(duplicates.sum()),
+            'missing_dates': int(dates.isna().sum()),
+            'sentiment_gaps': gaps,
+            'missing_days_total': int(gaps['missing_days'].sum())
+        }
+        
+        print(f"Sentiment validation: {int(duplicates.sum())} duplicate dates dropped, "
+              f"{len(gaps)} gaps ({int(gaps['missing_days'].sum())} missing days)")
+        return self.validation_report['fear_greed']
+    
+    def detect_sentiment_regimes(self, n_regimes=3, stay_probability=0.97):
+        """
+        Label sentiment regimes over the Fear/Greed history, one day at a time.
+
+        Adds 'regime' (0 = most fearful) and 'regime_probability' columns;
+        each label uses only readings up to its own date. The filter is kept on self.regime_filter so new readings can be
+        labelled online with self.regime_filter.update(value).
+        """
+        print(f"\nDetecting {n_regimes} sentiment regimes...")
+        
+        self.regime_filter, regimes, regime_probability = label_sentiment_regimes(
+            self.fear_greed_data['date'].values, self.fear_greed_data['sentiment_score'].values,
+            n_regimes, stay_probability)
+        self.fear_greed_data['regime'] = regimes
+        self.fear_greed_data['regime_probability'] = regime_probability
+        
+        print("Learned regime means: " + ", ".join(f"{m:.1f}" for m in self.regime_filter.means))
+        print("Regime detection completed.")
+        return self.fear_greed_data
+    
     def preprocess_historical_data(self):
         """Preprocess the historical trader data."""
         print("\nPreprocessing Historical Trader Data...")
@@ -80,14 +390,24 @@ class BitcoinSentimentAnalyzer:
         self.historical_data['date'] = self.historical_data['Timestamp IST'].dt.date
         
         numeric_columns = ['Execution Price', 'Size Tokens', 'Size USD', 'Closed PnL', 'Fee']
+        coerced_to_nan = {}
         for col in numeric_columns:
-            self.historical_data[col] = pd.to_numeric(self.historical_data[col], errors='coerce')
+            raw = self.historical_data[col]
+            self.historical_data[col] = pd.to_numeric(raw, errors='coerce')
+            coerced_to_nan[col] = int((self.historical_data[col].isna() & raw.notna()).sum())
+        
+        self.validate_historical_data(coerced_to_nan=coerced_to_nan)
+        
+        # Integer-code days as well; distinct counting works on account/day codes.
+        account_codes = self._account_codes
+        self.historical_data['account_id'] = pd.Series(account_codes, index=self.historical_data.index).where(account_codes >= 0)
+        self._day_codes, _ = pd.factorize(self.historical_data['date'], sort=True)
         
         daily_metrics = self.historical_data.groupby('date').agg({
             'Closed PnL': ['sum', 'mean', 'count'],
             'Size USD': ['sum', 'mean'],
             'Fee': 'sum',
-            'Account': 'nunique'
+            'account_id': 'nunique'
         }).round(2)
         
         daily_metrics.columns = ['total_pnl', 'avg_pnl', 'trade_count', 'total_volume', 'avg_trade_size', 'total_fees', 'unique_traders']
@@ -101,6 +421,117 @@ class BitcoinSentimentAnalyzer:
         print("Historical data preprocessing completed.")
         return self.daily_metrics
     
+    def validate_historical_data(self, dedup_key=DEDUP_KEY,
+                                 clock_tolerance=pd.Timedelta(minutes=1), coerced_to_nan=None):
+        """
+        Deduplicate fills and record data-quality checks as vectorized masks.
+
+        Fills are deduplicated on the composite dedup_key (columns missing from
+        the file are skipped; with no fill-identity column left, deduplication
+        is skipped and reported as such). The report counts out-of-order timestamps,
+        fills whose 'Timestamp IST' disagrees with 'Timestamp' (UTC + 5:30)
+        by more than clock_tolerance, and numerics coerced to NaN.
+        """
+        data = self.historical_data
+        key = [col for col in dedup_key if col in data.columns]
+        dedup_skipped = not any(col != 'Account' for col in key)
+        if dedup_skipped:
+            print(f"Warning: none of {[col for col in dedup_key if col != 'Account']} found; "
+                  f"fills were not deduplicated")
+        
+        # Integer-code accounts once; dedup, ordering checks and distinct counting reuse the codes.
+        account_codes, self.account_index = pd.factorize(data['Account'])
+        duplicates = find_duplicate_fills(data, key, account_codes)
+        data = data[~duplicates].reset_index(drop=True)
+        account_codes = account_codes[~duplicates]
+        self._account_codes = account_codes
+        
+        timestamps = data['Timestamp'].values
+        out_of_order = int(np.sum(timestamps[1:] < timestamps[:-1]))
+        if out_of_order:
+            # Small integer codes let the stable sort use an O(n) radix sort
+            sort_codes = account_codes.astype(np.uint16) if len(self.account_index) < 2**16 else account_codes
+            order = np.argsort(sort_codes, kind='stable')
+            same_account = account_codes[order][1:] == account_codes[order][:-1]
+            out_of_order_by_account = int(np.sum(same_account & (timestamps[order][1:] < timestamps[order][:-1])))
+        else:
+            out_of_order_by_account = 0
+        
+        # IST is UTC + 5:30 truncated to the minute; compare in integer nanoseconds
+        utc_ns = data['Timestamp'].values.astype('datetime64[ns]').view(np.int64)
+        ist_ns = data['Timestamp IST'].values.astype('datetime64[ns]').view(np.int64)
+        expected_ns = utc_ns + pd.Timedelta(hours=5, minutes=30).value
+        expected_ns -= expected_ns % pd.Timedelta(minutes=1).value
+        present = ~(np.isnat(data['Timestamp'].values) | np.isnat(data['Timestamp IST'].values))
+        skew_ns = np.where(present, np.abs(ist_ns - expected_ns), 0)
+        inconsistent = skew_ns > clock_tolerance.value
+        
+        self.historical_data = data
+        self.validation_report['historical'] = {
+            'rows': len(duplicates),
+            'dedup_key': [] if dedup_skipped else key,
+            'dedup_skipped': dedup_skipped,
+            'duplicate_fills_dropped': int(duplicates.sum()),
+            'out_of_order_fills': out_of_order,
+            'out_of_order_fills_by_account': out_of_order_by_account,
+            'timestamp_mismatches': int(inconsistent.sum()),
+            'max_timestamp_skew': pd.Timedelta(int(skew_ns.max()) if len(skew_ns) else 0),
+            'missing_timestamps': int(data['Timestamp'].isna().sum() + data['Timestamp IST'].isna().sum()),
+            'coerced_to_nan': coerced_to_nan or {}
+        }
+        
+        print(f"Fill validation: {int(duplicates.sum())} duplicates dropped, "
+              f"{out_of_order_by_account} out-of-order fills within accounts, "
+              f"{int(inconsistent.sum())} IST/UTC timestamp mismatches, "
+              f"{sum((coerced_to_nan or {}).values())} numerics coerced to NaN")
+        return self.validation_report['historical']
+    
+    def compute_distinct_traders(self, windows=(7, 30), method='exact', precision=12):
+        """
+        Add rolling distinct-trader counts to daily_metrics.
+
+        Builds one sketch per trading day and merges the sketches of each
+        trailing calendar window instead of re-scanning raw trades. The
+        'exact' method unions per-day account bitmaps; 'hll' merges per-day
+        HyperLogLog sketches with the given precision.
+        """
+        if method not in _DISTINCT_METHODS:
+            raise ValueError(f"Unknown distinct-count method '{method}', expected one of {sorted(_DISTINCT_METHODS)}")
+        print(f"\nComputing distinct traders ({method}) over windows {list(windows)}...")
+        
+        n_days = len(self.daily_metrics)
+        if method == 'exact':
+            sketches = _account_bitmaps(self._day_codes, self._account_codes, n_days, len(self.account_index))
+        else:
+            sketches = _hll_registers(self._day_codes, self._account_codes, n_days, precision)
+        self.distinct_sketches = (method, sketches)
+        
+        merge, count = _DISTINCT_METHODS[method]
+        day_numbers = self.daily_metrics['date'].values.astype('datetime64[D]').astype(np.int64)
+        for window in windows:
+            starts = np.searchsorted(day_numbers, day_numbers - window + 1, side='left')
+            merged = np.stack([merge.reduce(sketches[start:end + 1], axis=0)
+                               for end, start in enumerate(starts)]) if n_days else sketches
+            counts = count(merged)
+            self.daily_metrics[f'unique_traders_{window}d'] = counts if method == 'exact' else np.round(counts)
+        
+        print("Distinct trader counting completed.")
+        return self.daily_metrics
+    
+    def count_distinct_traders(self, dates):
+        """Count distinct traders across an arbitrary set of trading dates."""
+        method, sketches = self.distinct_sketches
+        merge, count = _DISTINCT_METHODS[method]
+        day_numbers = self.daily_metrics['date'].values.astype('datetime64[D]')
+        wanted = np.unique(pd.to_datetime(pd.Series(dates)).values.astype('datetime64[D]'))
+        rows = np.searchsorted(day_numbers, wanted)
+        found = rows < len(day_numbers)
+        rows = rows[found][day_numbers[rows[found]] == wanted[found]]
+        if len(rows) == 0:
+            return 0
+        result = count(merge.reduce(sketches[rows], axis=0))
+        return int(result) if method == 'exact' else int(round(float(result)))
+    
     def merge_datasets(self):
         """Merge Fear/Greed data with historical trader data."""
         print("\nMerging datasets...")
@@ -112,6 +543,14 @@ class BitcoinSentimentAnalyzer:
             how='inner'
         )
         
+        trade_dates = self.daily_metrics['date'].values
+        sentiment_dates = self.fear_greed_data['date'].values
+        unmatched = pd.to_datetime(trade_dates[~np.isin(trade_dates, sentiment_dates)])
+        self.validation_report['unmatched_trade_dates'] = unmatched
+        if len(unmatched):
+            print(f"Warning: {len(unmatched)} trading days have no sentiment reading and were dropped "
+                  f"({unmatched.min().date()} to {unmatched.max().date()})")
+        
         print(f"Merged data shape: {self.merged_data.shape}")
         print("Data merging completed.")
         return self.merged_data
@@ -133,11 +572,11 @@ class BitcoinSentimentAnalyzer:
         
         return correlation_matrix, sentiment_correlations
     
-    def analyze_performance_by_sentiment_category(self):
-        """Analyze trader performance by sentiment category."""
-        print("\nAnalyzing performance by sentiment category...")
+    def analyze_performance_by_sentiment_category(self, by='sentiment_category'):
+        """Analyze trader performance by sentiment category (or by 'regime')."""
+        print(f"\nAnalyzing performance by {by.replace('_', ' ')}...")
         
-        sentiment_performance = self.merged_data.groupby('sentiment_category').agg({
+        sentiment_performance = self.merged_data.groupby(by).agg({
             'total_pnl': ['mean', 'median', 'std'],
             'avg_pnl': ['mean', 'median'],
             'win_rate': ['mean', 'median'],
@@ -146,7 +585,12 @@ class BitcoinSentimentAnalyzer:
             'unique_traders': 'mean'
         }).round(2)
         
-        print("\nPerformance by Sentiment Category:")
+        if self.distinct_sketches is not None:
+            # Distinct traders over all days in each category, not a mean of daily counts.
+            sentiment_performance[('unique_traders', 'distinct')] = self.merged_data.groupby(by)['date'].apply(
+                self.count_distinct_traders)
+        
+        print(f"\nPerformance by {by.replace('_', ' ').title()}:")
         print(sentiment_performance)
         
         return sentiment_performance
@@ -154,6 +598,7 @@ class BitcoinSentimentAnalyzer:
     def create_visualizations(self):
         """Create comprehensive visualizations."""
         print("\nCreating visualizations...")
+        plt, sns = _import_plotting()
         
         fig = plt.figure(figsize=(20, 15))
         
@@ -242,6 +687,26 @@ class BitcoinSentimentAnalyzer:
         
         print("Visualizations saved as 'bitcoin_sentiment_analysis.png'")
     
+    def export_results(self, db_path='/Users/sohamajmera/Desktop/primetradetask/analysis_results.db'):
+        """Upsert daily, per-account and merged metrics into an SQLite file."""
+        print(f"\nExporting analysis results to {db_path}...")
+        
+        history = self.historical_data.dropna(subset=['Account'])
+        account_daily = history.groupby([pd.to_datetime(history['date']), 'Account']).agg(
+            total_pnl=('Closed PnL', 'sum'),
+            trade_count=('Closed PnL', 'size'),
+            total_volume=('Size USD', 'sum'),
+            total_fees=('Fee', 'sum')
+        ).reset_index().rename(columns={'Account': 'account'})
+        
+        export_to_sqlite(db_path, [
+            ('daily_metrics', self.daily_metrics, ['date'], []),
+            ('account_daily_metrics', account_daily, ['date', 'account'], ['account']),
+            ('merged_data', self.merged_data, ['date'], ['sentiment_category']),
+        ])
+        
+        print("Export completed.")
+    
     def generate_insights(self):
         """Generate key insights and recommendations."""
         print("\n" + "="*60)
@@ -333,16 +798,22 @@ class BitcoinSentimentAnalyzer:
         self.load_data()
         
         self.preprocess_fear_greed_data()
+        self.detect_sentiment_regimes()
         self.preprocess_historical_data()
+        self.compute_distinct_traders()
         
         self.merge_datasets()
         
         correlation_matrix, sentiment_correlations = self.analyze_sentiment_performance_correlation()
         sentiment_performance = self.analyze_performance_by_sentiment_category()
+        regime_performance = self.analyze_performance_by_sentiment_category(by='regime')
         
         self.create_visualizations()
         
         insights = self.generate_insights()
+        insights['regime_performance'] = regime_performance
+        
+        self.export_results()
         
         print("\nAnalysis completed successfully!")
         print("Results saved as 'bitcoin_sentiment_analysis.png'")
@@ -0,0 +1,67 @@
+"""Shared fixtures: synthetic Hyperliquid fills over the real Fear/Greed series."""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+FEAR_GREED_PATH = os.path.join(REPO_ROOT, 'fear_greed_index.csv')
+MERGED_DATA_PATH = os.path.join(REPO_ROOT, 'merged_data.csv')
+
+def make_fills(n, seed=0, start='2024-01-01', end='2024-06-01', n_accounts=60):
+    """Build n synthetic fills in the historical_data.csv layout."""
+    rng = np.random.default_rng(seed)
+    ts = np.sort(rng.integers(pd.Timestamp(start).value // 10**6, pd.Timestamp(end).value // 10**6, n))
+    coins = rng.choice(['BTC', 'ETH', 'SOL'], n)
+    prices = np.empty(n)
+    for coin, start_price in [('BTC', 40000), ('ETH', 2000), ('SOL', 100)]:
+        mask = coins == coin
+        prices[mask] = start_price * np.exp(np.cumsum(rng.normal(0, 0.01, mask.sum())))
+    ist = pd.to_datetime(ts, unit='ms') + pd.Timedelta(hours=5, minutes=30)
+    return pd.DataFrame({
+        'Account': rng.choice([f'0x{i:040x}' for i in range(n_accounts)], n),
+        'Coin': coins,
+        'Execution Price': prices,
+        'Size Tokens': rng.random(n),
+        'Size USD': rng.random(n) * 1000,
+        'Side': rng.choice(['BUY', 'SELL'], n),
+        'Timestamp IST': ist.strftime('%d-%m-%Y %H:%M'),
+        'Start Position': 0.0,
+        'Direction': rng.choice(['Open Long', 'Close Long', 'Open Short', 'Close Short', 'Buy', 'Long > Short'], n),
+        'Closed PnL': rng.normal(0, 50, n),
+        'Transaction Hash': [f'0xhash{i}' for i in range(n)],
+        'Order ID': rng.integers(0, 10**9, n),
+        'Crossed': True,
+        'Fee': rng.random(n),
+        'Trade ID': np.arange(n),
+        'Timestamp': ts,
+    })
+
+@pytest.fixture
+def fills():
+    return make_fills(5000)
+
+@pytest.fixture
+def historical_csv(tmp_path, fills):
+    path = tmp_path / 'historical_data.csv'
+    fills.to_csv(path, index=False)
+    return str(path)
+
+@pytest.fixture
+def analyzer(historical_csv, capsys):
+    """Analyzer run through preprocessing and merging on the synthetic fills."""
+    from bitcoin_sentiment_analysis import BitcoinSentimentAnalyzer
+    analyzer = BitcoinSentimentAnalyzer(FEAR_GREED_PATH, historical_csv)
+    analyzer.load_data()
+    analyzer.preprocess_fear_greed_data()
+    analyzer.detect_sentiment_regimes()
+    analyzer.preprocess_historical_data()
+    analyzer.compute_distinct_traders()
+    analyzer.merge_datasets()
+    capsys.readouterr()
+    return analyzer
@@ -0,0 +1,84 @@
+"""
+Reference iterrows implementations of the path-dependent strategies.
+
+These are the original row-by-row loops, kept verbatim so the array kernels
+in advanced_trading_strategies can be checked and benchmarked against them.
+"""
+
+import pandas as pd
+
+def contrarian_iterrows(data, initial_capital=100000):
+    portfolio_value = initial_capital
+    position_size = 0
+    trades = []
+    
+    for idx, row in data.iterrows():
+        sentiment = row['sentiment_score']
+        daily_pnl = row['total_pnl']
+        
+        if sentiment <= 30:
+            if position_size < 0.8:
+                position_size += 0.1
+                action = "BUY"
+        elif sentiment >= 70:
+            if position_size > 0.2:
+                position_size -= 0.1
+                action = "SELL"
+        else:
+            action = "HOLD"
+        
+        portfolio_return = (daily_pnl / 1000000) * position_size
+        portfolio_value += portfolio_return
+        
+        trades.append({
+            'date': row['date'],
+            'sentiment': sentiment,
+            'action': action,
+            'position_size': position_size,
+            'daily_pnl': daily_pnl,
+            'portfolio_value': portfolio_value,
+            'portfolio_return': portfolio_return
+        })
+    
+    return pd.DataFrame(trades)
+
+def momentum_iterrows(data, initial_capital=100000):
+    data = data.copy()
+    data['sentiment_ma5'] = data['sentiment_score'].rolling(window=5).mean()
+    data['sentiment_momentum'] = data['sentiment_score'] - data['sentiment_ma5']
+    
+    portfolio_value = initial_capital
+    position_size = 0.5
+    trades = []
+    
+    for idx, row in data.iterrows():
+        if pd.isna(row['sentiment_momentum']):
+            continue
+        
+        momentum = row['sentiment_momentum']
+        daily_pnl = row['total_pnl']
+        
+        if momentum < -5:
+            position_size = min(0.8, position_size + 0.1)
+            action = "BUY"
+        elif momentum > 5:
+            position_size = max(0.2, position_size - 0.1)
+            action = "SELL"
+        else:
+            action = "HOLD"
+        
+        portfolio_return = (daily_pnl / 1000000) * position_size
+        portfolio_value += portfolio_return
+        
+        trades.append({
+            'date': row['date'],
+            'sentiment': row['sentiment_score'],
+            'momentum': momentum,
+            'action': action,
+            'position_size': position_size,
+            'daily_pnl': daily_pnl,
+            'portfolio_value': portfolio_value,
+            'portfolio_return': portfolio_return
+        })
+    
+    return pd.DataFrame(trades)
@@ -0,0 +1,55 @@
+"""Distinct-trader counting against brute-force nunique over raw fills."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import bitcoin_sentiment_analysis as bsa
+
+def brute_window_counts(history, dates, window):
+    fill_dates = pd.to_datetime(history['date'])
+    return np.array([
+        history.loc[(fill_dates > day - pd.Timedelta(days=window)) & (fill_dates <= day), 'Account'].nunique()
+        for day in dates
+    ])
+
+def test_exact_rolling_counts_match_brute_force(analyzer):
+    metrics = analyzer.daily_metrics
+    for window in (7, 30):
+        expected = brute_window_counts(analyzer.historical_data, metrics['date'], window)
+        np.testing.assert_array_equal(metrics[f'unique_traders_{window}d'].values, expected)
+
+def test_exact_daily_bitmap_matches_nunique(analyzer):
+    _, bitmaps = analyzer.distinct_sketches
+    np.testing.assert_array_equal(bsa._bitmap_cardinality(bitmaps), analyzer.daily_metrics['unique_traders'].values)
+
+def test_count_distinct_traders_over_categories(analyzer):
+    fill_dates = pd.to_datetime(analyzer.historical_data['date'])
+    for category, dates in analyzer.merged_data.groupby('sentiment_category')['date']:
+        expected = analyzer.historical_data.loc[fill_dates.isin(dates), 'Account'].nunique()
+        assert analyzer.count_distinct_traders(dates) == expected
+    assert analyzer.count_distinct_traders(pd.to_datetime(['1999-01-01'])) == 0
+
+def test_hll_estimates_are_close(analyzer, capsys):
+    exact = analyzer.daily_metrics[['unique_traders_7d', 'unique_traders_30d']].values.astype(float)
+    analyzer.compute_distinct_traders(method='hll')
+    approx = analyzer.daily_metrics[['unique_traders_7d', 'unique_traders_30d']].values
+    assert np.max(np.abs(approx - exact) / exact) < 0.05
+
+def test_hll_merge_equals_sketch_of_union():
+    rng = np.random.default_rng(1)
+    codes = rng.integers(0, 50000, 200000)
+    days = rng.integers(0, 4, len(codes))
+    per_day = bsa._hll_registers(days, codes, 4)
+    union = bsa._hll_registers(np.zeros(len(codes), dtype=int), codes, 1)[0]
+    np.testing.assert_array_equal(np.maximum.reduce(per_day, axis=0), union)
+    estimate = bsa._hll_estimate(union)
+    assert abs(estimate - len(np.unique(codes))) / len(np.unique(codes)) < 0.05
+
+def test_hll_rejects_bad_precision():
+    with pytest.raises(ValueError):
+        bsa._hll_registers(np.zeros(1, dtype=int), np.zeros(1, dtype=int), 1, precision=20)
+
+def test_unknown_method_raises(analyzer):
+    with pytest.raises(ValueError):
+        analyzer.compute_distinct_traders(method='bogus')
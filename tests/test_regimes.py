@@ -0,0 +1,83 @@
+"""Regime detection: online filtering and consistency between the two scripts."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from advanced_trading_strategies import AdvancedTradingStrategies
+from bitcoin_sentiment_analysis import SentimentRegimeFilter, label_sentiment_regimes
+from conftest import FEAR_GREED_PATH, MERGED_DATA_PATH
+
+def test_online_updates_match_batch_filter():
+    scores = pd.read_csv(FEAR_GREED_PATH)['value'].values
+    batch = SentimentRegimeFilter.from_history(scores).filter(scores)
+    online = SentimentRegimeFilter.from_history(scores)
+    for i, score in enumerate(scores):
+        np.testing.assert_allclose(online.update(score), batch[i])
+
+def test_regimes_are_ordered_fear_to_greed():
+    scores = pd.read_csv(FEAR_GREED_PATH)['value'].values
+    regime_filter = SentimentRegimeFilter.from_history(scores)
+    assert np.all(np.diff(regime_filter.means) > 0)
+    assert regime_filter.filter([5.0])[0].argmax() == 0
+
+def test_strategy_regimes_match_analyzer(analyzer, capsys):
+    merged = analyzer.merged_data.drop(columns=['regime', 'regime_probability'])
+    strategies = AdvancedTradingStrategies(merged, pd.read_csv(FEAR_GREED_PATH))
+    strategy_df = strategies.regime_strategy()
+    expected = analyzer.merged_data.set_index('date')['regime']
+    np.testing.assert_array_equal(strategy_df['regime'].values, expected.loc[strategy_df['date']].values)
+
+def test_merged_csv_labels_come_from_the_fear_greed_history(capsys):
+    merged = pd.read_csv(MERGED_DATA_PATH)
+    merged['date'] = pd.to_datetime(merged['date'])
+    fear_greed = pd.read_csv(FEAR_GREED_PATH)
+    fear_greed['date'] = pd.to_datetime(fear_greed['date'])
+    strategies = AdvancedTradingStrategies(merged, fear_greed)
+    strategy_df = strategies.regime_strategy()
+    _, regimes, _ = label_sentiment_regimes(fear_greed['date'].values, fear_greed['value'].values)
+    expected = pd.Series(regimes, index=fear_greed['date']).loc[merged['date']].values
+    np.testing.assert_array_equal(strategy_df['regime'].values, expected)
+
+def test_labels_use_no_future_readings():
+    fear_greed = pd.read_csv(FEAR_GREED_PATH)
+    fear_greed['date'] = pd.to_datetime(fear_greed['date'])
+    fear_greed = fear_greed.sort_values('date')
+    dates, scores = fear_greed['date'].values, fear_greed['value'].values
+    full_filter, full, full_probs = label_sentiment_regimes(dates, scores)
+    for n in [200, 1000]:
+        prefix_filter, prefix, prefix_probs = label_sentiment_regimes(dates[:n], scores[:n])
+        np.testing.assert_array_equal(prefix, full[:n])
+        np.testing.assert_allclose(prefix_probs, full_probs[:n])
+    # The emission parameters keep adapting to later readings
+    assert not np.allclose(prefix_filter.means, full_filter.means)
+
+def test_fixed_parameters_without_learning():
+    regime_filter = SentimentRegimeFilter([20.0, 50.0, 80.0], [8.0, 8.0, 8.0], learn=False)
+    regime_filter.filter([10.0, 90.0, 50.0])
+    np.testing.assert_array_equal(regime_filter.means, [20.0, 50.0, 80.0])
+
+def test_allocations_sized_by_regime_count(capsys):
+    merged = pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=4),
+        'sentiment_score': [20, 50, 20, 50],
+        'total_pnl': [1.0, 2.0, 3.0, 4.0],
+        'regime': [0, 1, 0, 1],
+    })
+    strategy_df = AdvancedTradingStrategies(merged).regime_strategy(n_regimes=3)
+    np.testing.assert_allclose(strategy_df['position_size'].values, [0.8, 0.5, 0.8, 0.5])
+
+def test_days_after_the_history_get_the_midpoint_allocation(capsys):
+    fear_greed = pd.read_csv(FEAR_GREED_PATH)
+    last_date = pd.to_datetime(fear_greed['date']).max()
+    merged = pd.DataFrame({'date': pd.date_range(last_date + pd.Timedelta(days=1), periods=3),
+                           'sentiment_score': [20, 50, 80], 'total_pnl': [1.0, 2.0, 3.0]})
+    strategy_df = AdvancedTradingStrategies(merged, fear_greed).regime_strategy()
+    assert strategy_df['regime'].isna().all()
+    np.testing.assert_allclose(strategy_df['position_size'].values, 0.5)
+
+def test_regime_strategy_without_labels_or_history_raises(capsys):
+    merged = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=2),
+                           'sentiment_score': [20, 80], 'total_pnl': [1.0, 2.0]})
+    with pytest.raises(ValueError):
+        AdvancedTradingStrategies(merged).regime_strategy()
@@ -0,0 +1,52 @@
+"""SQLite export: bulk upserts, schema evolution and indexes."""
+
+import sqlite3
+
+import pandas as pd
+
+from advanced_trading_strategies import AdvancedTradingStrategies
+from bitcoin_sentiment_analysis import export_to_sqlite
+
+def table_counts(db_path, tables):
+    with sqlite3.connect(db_path) as conn:
+        return {table: conn.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+
+def test_reexport_does_not_duplicate_rows(analyzer, tmp_path, capsys):
+    db_path = str(tmp_path / 'results.db')
+    strategies = AdvancedTradingStrategies(analyzer.merged_data)
+    strategies.contrarian_strategy()
+    strategies.regime_strategy()
+    
+    analyzer.export_results(db_path)
+    strategies.export_results(db_path)
+    tables = ['daily_metrics', 'account_daily_metrics', 'merged_data', 'strategy_trades', 'strategy_results']
+    first = table_counts(db_path, tables)
+    analyzer.export_results(db_path)
+    strategies.export_results(db_path)
+    
+    assert table_counts(db_path, tables) == first
+    assert first['daily_metrics'] == len(analyzer.daily_metrics)
+    assert first['strategy_trades'] == sum(len(df) for df in strategies.strategies.values())
+    assert first['strategy_results'] == 2
+
+def test_upsert_updates_rows_and_adds_new_columns(tmp_path, capsys):
+    db_path = str(tmp_path / 'results.db')
+    dates = pd.to_datetime(['2024-01-01', '2024-01-02'])
+    export_to_sqlite(db_path, [('metrics', pd.DataFrame({'date': dates, 'pnl': [1.0, 2.0]}), ['date'], [])])
+    newer = pd.DataFrame({'date': pd.to_datetime(['2024-01-02', '2024-01-03']),
+                          'pnl': [5.0, 6.0], 'traders': [3, 4], 'flag': [True, False]})
+    export_to_sqlite(db_path, [('metrics', newer, ['date'], ['traders'])])
+    
+    with sqlite3.connect(db_path) as conn:
+        rows = conn.execute('SELECT date, pnl, traders, flag FROM metrics ORDER BY date').fetchall()
+        indexes = {row[1] for row in conn.execute('PRAGMA index_list("metrics")')}
+    assert rows == [('2024-01-01', 1.0, None, None), ('2024-01-02', 5.0, 3, 1), ('2024-01-03', 6.0, 4, 0)]
+    assert 'idx_metrics_traders' in indexes
+
+def test_account_queries_use_index(analyzer, tmp_path, capsys):
+    db_path = str(tmp_path / 'results.db')
+    analyzer.export_results(db_path)
+    with sqlite3.connect(db_path) as conn:
+        plan = conn.execute('EXPLAIN QUERY PLAN SELECT * FROM account_daily_metrics WHERE account = ?',
+                            ('0x0',)).fetchall()
+    assert 'idx_account_daily_metrics_account' in str(plan)
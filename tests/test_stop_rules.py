@@ -0,0 +1,141 @@
+"""Stop-loss / take-profit simulator against a brute-force per-trade replay."""
+
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import advanced_trading_strategies as ats
+from conftest import FEAR_GREED_PATH, MERGED_DATA_PATH, make_fills
+
+@pytest.fixture
+def strategies():
+    merged = pd.read_csv(MERGED_DATA_PATH)
+    merged['date'] = pd.to_datetime(merged['date'])
+    return ats.AdvancedTradingStrategies(merged, pd.read_csv(FEAR_GREED_PATH))
+
+def brute_force_exits(fills, sentiment_by_date):
+    """Replay each entry row by row: next close of the same account/coin, first SL/TP breach."""
+    fills = fills.assign(ts=pd.to_datetime(fills['Timestamp'], unit='ms'))
+    fills = fills.reset_index(drop=True).reset_index().sort_values(['Coin', 'ts'], kind='stable')
+    exits = []
+    for i in fills.sort_values('index').index[fills.sort_values('index')['Direction'].str.startswith('Open')]:
+        entry = fills.loc[i]
+        tape = fills[fills['Coin'] == entry['Coin']]
+        later = tape.iloc[list(tape.index).index(i) + 1:]
+        closes = later[(later['Account'] == entry['Account'])
+                       & (later['Direction'].str.startswith('Close') | later['Direction'].str.contains('>'))]
+        end = later.index.get_loc(closes.index[0]) if len(closes) else len(later) - 1
+        side = -1 if 'Short' in entry['Direction'] else 1
+        date = pd.to_datetime(entry['Timestamp IST'], format='%d-%m-%Y %H:%M').normalize()
+        stop_loss, take_profit = ats._risk_levels(sentiment_by_date.get(date, np.nan))
+        exit_price = later['Execution Price'].values[end] if len(later) else entry['Execution Price']
+        for price in later['Execution Price'].values[:end]:
+            move = side * (price / entry['Execution Price'] - 1)
+            if move <= -stop_loss or move >= take_profit:
+                exit_price = price
+                break
+        exits.append(exit_price)
+    return np.array(exits)
+
+def test_matches_brute_force_replay(strategies, capsys):
+    fills = make_fills(1500, seed=7)
+    trades = strategies.simulate_stop_rules(fills)
+    fear_greed = pd.read_csv(FEAR_GREED_PATH)
+    sentiment_by_date = pd.Series(fear_greed['value'].values, index=pd.to_datetime(fear_greed['date']))
+    np.testing.assert_allclose(trades['rule_exit_price'].values, brute_force_exits(fills, sentiment_by_date))
+    assert (trades['outcome'] != 'HELD').any()
+
+def test_sentiment_from_full_history(capsys):
+    # Fills on days outside the merged trading days still get that day's reading
+    fills = make_fills(800, seed=8, start='2020-01-01', end='2020-03-01')
+    merged = pd.read_csv(MERGED_DATA_PATH)
+    merged['date'] = pd.to_datetime(merged['date'])
+    fear_greed = pd.read_csv(FEAR_GREED_PATH)
+    
+    with_history = ats.AdvancedTradingStrategies(merged, fear_greed)
+    trades = with_history.simulate_stop_rules(fills)
+    assert trades['sentiment'].notna().all()
+    assert with_history.stop_rule_results['entries_without_sentiment'] == 0
+    
+    merged_only = ats.AdvancedTradingStrategies(merged)
+    merged_only.simulate_stop_rules(fills)
+    assert merged_only.stop_rule_results['entries_without_sentiment'] == len(trades)
+
+def test_duplicate_fills_are_dropped(strategies, capsys):
+    fills = make_fills(1000, seed=9)
+    baseline = strategies.simulate_stop_rules(fills)
+    duplicated = pd.concat([fills, fills.iloc[::10]]).sort_values('Timestamp', kind='stable')
+    trades = strategies.simulate_stop_rules(duplicated)
+    assert strategies.stop_rule_results['duplicate_fills_dropped'] == 100
+    assert len(trades) == len(baseline)
+    np.testing.assert_allclose(trades['rule_pnl'].values, baseline['rule_pnl'].values)
+
+def test_fills_without_identity_columns_are_kept(strategies, capsys):
+    fills = make_fills(1000, seed=9)
+    baseline = strategies.simulate_stop_rules(fills)
+    trades = strategies.simulate_stop_rules(fills.drop(columns=['Transaction Hash', 'Order ID', 'Trade ID']))
+    assert strategies.stop_rule_results['dedup_skipped']
+    assert strategies.stop_rule_results['duplicate_fills_dropped'] == 0
+    assert len(trades) == len(baseline)
+
+def test_metrics_are_normalized_by_notional(strategies, capsys):
+    trades = strategies.simulate_stop_rules(make_fills(2000, seed=10))
+    results = strategies.stop_rule_results
+    notional = trades['size_usd'].sum()
+    assert results['notional'] == pytest.approx(notional)
+    for label, pnl_col in [('actual', 'actual_pnl'), ('rules', 'rule_pnl')]:
+        pnl = trades[pnl_col].sum()
+        assert results[label]['return_on_notional'] == pytest.approx(pnl / notional * 100)
+        assert -100 <= results[label]['max_drawdown'] <= 0
+    
+    accounts = strategies.stop_rule_accounts.set_index('account')
+    by_account = trades.groupby('account')
+    np.testing.assert_allclose(accounts['notional'], by_account['size_usd'].sum().loc[accounts.index])
+    np.testing.assert_allclose(accounts['rules_pnl'], by_account['rule_pnl'].sum().loc[accounts.index])
+    for account, group in by_account:
+        curve = np.concatenate([[0.0], group.sort_values('rule_exit_time', kind='stable')['rule_pnl'].cumsum()])
+        drawdown = (curve - np.maximum.accumulate(curve)).min() / group['size_usd'].sum() * 100
+        assert accounts.loc[account, 'rules_max_drawdown'] == pytest.approx(drawdown)
+
+def test_incremental_export_keys_on_entry_fill(strategies, tmp_path, capsys):
+    db_path = str(tmp_path / 'results.db')
+    fills = make_fills(1500, seed=11)
+    strategies.contrarian_strategy()
+    
+    first = strategies.simulate_stop_rules(fills.iloc[:1000])
+    strategies.export_results(db_path)
+    strategies.export_results(db_path)
+    second = strategies.simulate_stop_rules(fills.iloc[500:])
+    strategies.export_results(db_path)
+    
+    expected = pd.concat([first, second]).drop_duplicates(subset=ats.STOP_RULE_KEY)
+    with sqlite3.connect(db_path) as conn:
+        stored = pd.read_sql('SELECT * FROM stop_rule_trades', conn)
+    assert len(stored) == len(expected)
+    assert stored['entry_time'].str.contains(r'\.\d{6}$').all()
+    
+    # Rows from the later run hold the later run's values
+    stored = stored.set_index('entry_trade_id')
+    latest = second.set_index('entry_trade_id')
+    np.testing.assert_allclose(stored.loc[latest.index, 'rule_pnl'].values, latest['rule_pnl'].values)
+
+def test_export_keeps_key_schema_when_id_columns_are_missing(strategies, tmp_path, capsys):
+    db_path = str(tmp_path / 'results.db')
+    fills = make_fills(1500, seed=12)
+    strategies.contrarian_strategy()
+    
+    first = strategies.simulate_stop_rules(fills.iloc[:1000])
+    strategies.export_results(db_path)
+    partial = fills.iloc[1000:].drop(columns=['Trade ID'])
+    partial.loc[partial.index[::3], 'Order ID'] = np.nan
+    second = strategies.simulate_stop_rules(partial)
+    assert list(second.columns[:6]) == ['entry_time', 'account', 'coin'] + ats.STOP_RULE_KEY[3:]
+    strategies.export_results(db_path)
+    strategies.export_results(db_path)
+    
+    with sqlite3.connect(db_path) as conn:
+        stored = pd.read_sql('SELECT * FROM stop_rule_trades', conn)
+    assert len(stored) == len(first) + len(second)
+    assert (stored['entry_trade_id'] == '').sum() == len(second)
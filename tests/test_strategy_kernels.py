@@ -0,0 +1,88 @@
+"""Array kernels for path-dependent strategies and stop-rule exits vs their reference loops."""
+
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import advanced_trading_strategies as ats
+from conftest import MERGED_DATA_PATH
+from reference_strategies import contrarian_iterrows, momentum_iterrows
+
+def merged_data():
+    data = pd.read_csv(MERGED_DATA_PATH)
+    data['date'] = pd.to_datetime(data['date'])
+    return data
+
+def synthetic_data(n, seed=0):
+    rng = np.random.default_rng(seed)
+    sentiment = rng.integers(0, 101, n)
+    sentiment[0] = 50  # the iterrows contrarian loop crashes if the first day is greed
+    return pd.DataFrame({
+        'date': pd.date_range('2018-02-01', periods=n),
+        'sentiment_score': sentiment,
+        'total_pnl': rng.normal(0, 1e5, n),
+    })
+
+CASES = [
+    ('contrarian_strategy', contrarian_iterrows),
+    ('sentiment_momentum_strategy', momentum_iterrows),
+]
+
+@pytest.fixture(params=['numba', 'fallback'])
+def kernel_path(request, monkeypatch):
+    monkeypatch.setattr(ats, '_KERNELS', {})
+    if request.param == 'numba':
+        pytest.importorskip('numba')
+    else:
+        monkeypatch.setitem(sys.modules, 'numba', None)
+    return request.param
+
+def assert_frames_identical(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    for col in expected.columns:
+        np.testing.assert_array_equal(actual[col].values, expected[col].values, err_msg=col)
+
+@pytest.mark.parametrize('method, reference', CASES)
+@pytest.mark.parametrize('data', [merged_data(), synthetic_data(3000)], ids=['merged', 'synthetic'])
+def test_kernels_match_iterrows(kernel_path, method, reference, data, capsys):
+    strategy_df = getattr(ats.AdvancedTradingStrategies(data), method)()
+    assert_frames_identical(strategy_df, reference(data))
+    
+    compiled = kernel_path == 'numba'
+    assert all(hasattr(kernel, 'py_func') == compiled for kernel in ats._KERNELS.values())
+
+def test_contrarian_starting_in_greed_holds(kernel_path, capsys):
+    # The iterrows loop raised UnboundLocalError here; the kernel reports HOLD
+    data = pd.DataFrame({'date': pd.date_range('2024-01-01', periods=3),
+                         'sentiment_score': [80, 20, 80], 'total_pnl': [1.0, 1.0, 1.0]})
+    strategy_df = ats.AdvancedTradingStrategies(data).contrarian_strategy()
+    assert list(strategy_df['action']) == ['HOLD', 'BUY', 'BUY']
+    np.testing.assert_allclose(strategy_df['position_size'], [0.0, 0.1, 0.1])
+
+def random_stop_rule_trades(n_tape, n_trades, seed):
+    rng = np.random.default_rng(seed)
+    tape_prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_tape)))
+    tape_prices[rng.random(n_tape) < 0.02] = np.nan
+    entry_pos = rng.integers(0, n_tape, n_trades)
+    entry_pos = entry_pos[~np.isnan(tape_prices[entry_pos])]
+    # Some entries are held to the end of the tape, like entries without a closing fill
+    holding = np.where(rng.random(len(entry_pos)) < 0.2, n_tape, rng.integers(0, 3000, len(entry_pos)))
+    exit_pos = np.minimum(entry_pos + holding, n_tape - 1)
+    stop_losses, take_profits = ats._risk_levels(rng.integers(0, 101, len(entry_pos)))
+    sides = rng.choice([-1.0, 1.0], len(entry_pos))
+    return tape_prices, entry_pos, exit_pos, sides, stop_losses, take_profits
+
+@pytest.mark.parametrize('n_tape, n_trades', [(1, 1), (50, 20), (20000, 5000)])
+def test_stop_rule_exits_match_loop(kernel_path, n_tape, n_trades):
+    args = random_stop_rule_trades(n_tape, n_trades, seed=n_tape)
+    expected_exits, expected_outcomes = ats._stop_rule_exits(*args)
+    exits, outcomes = ats._kernel(ats._stop_rule_exits, ats._stop_rule_exits_numpy)(*args)
+    np.testing.assert_array_equal(exits, expected_exits)
+    np.testing.assert_array_equal(outcomes, expected_outcomes)
+    if n_trades > 100:
+        assert set(np.unique(outcomes)) == {0, 1, 2}
+    
+    compiled = kernel_path == 'numba'
+    assert hasattr(ats._KERNELS[ats._stop_rule_exits], 'py_func') == compiled
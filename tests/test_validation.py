@@ -0,0 +1,71 @@
+"""Validation stage: deduplication and data-quality report against brute force."""
+
+import numpy as np
+import pandas as pd
+
+from bitcoin_sentiment_analysis import BitcoinSentimentAnalyzer
+from conftest import FEAR_GREED_PATH, make_fills
+
+DEDUP_KEY = ['Account', 'Transaction Hash', 'Order ID', 'Trade ID']
+
+def run_preprocess(tmp_path, fills):
+    path = tmp_path / 'historical_data.csv'
+    fills.to_csv(path, index=False)
+    analyzer = BitcoinSentimentAnalyzer(FEAR_GREED_PATH, str(path))
+    analyzer.load_data()
+    analyzer.preprocess_fear_greed_data()
+    analyzer.preprocess_historical_data()
+    return analyzer
+
+def test_dedup_matches_pandas_duplicated(tmp_path, capsys):
+    fills = make_fills(3000, seed=4)
+    # Exact duplicates, plus near-duplicates that differ only in the string column
+    near = fills.iloc[100:150].copy()
+    near['Transaction Hash'] = near['Transaction Hash'] + 'x'
+    fills = pd.concat([fills, fills.iloc[:40], near, fills.iloc[500:510]]).sample(frac=1, random_state=0)
+    analyzer = run_preprocess(tmp_path, fills)
+    
+    expected = fills.drop_duplicates(subset=DEDUP_KEY)
+    report = analyzer.validation_report['historical']
+    assert report['duplicate_fills_dropped'] == 50
+    assert len(analyzer.historical_data) == len(expected)
+    assert analyzer.daily_metrics['trade_count'].sum() == len(expected)
+    np.testing.assert_array_equal(analyzer.account_index[analyzer._account_codes],
+                                  analyzer.historical_data['Account'].values)
+
+def test_ordering_and_timestamp_checks(tmp_path, capsys):
+    fills = make_fills(2000, seed=5).sample(frac=1, random_state=1)
+    fills.iloc[:7, fills.columns.get_loc('Timestamp')] += 10 * 60 * 1000
+    analyzer = run_preprocess(tmp_path, fills)
+    report = analyzer.validation_report['historical']
+    
+    timestamps = pd.to_datetime(fills['Timestamp'], unit='ms')
+    assert report['out_of_order_fills'] == int((timestamps.diff() < pd.Timedelta(0)).sum())
+    by_account = timestamps.groupby(fills['Account'].values).diff()
+    assert report['out_of_order_fills_by_account'] == int((by_account < pd.Timedelta(0)).sum())
+    assert report['timestamp_mismatches'] == 7
+    assert report['max_timestamp_skew'] == pd.Timedelta(minutes=10)
+
+def test_sorted_fills_report_no_problems(analyzer):
+    report = analyzer.validation_report['historical']
+    assert report['duplicate_fills_dropped'] == 0
+    assert report['out_of_order_fills_by_account'] == 0
+    assert report['timestamp_mismatches'] == 0
+
+def test_sentiment_gaps_and_unmatched_dates(analyzer):
+    gaps = analyzer.validation_report['fear_greed']['sentiment_gaps']
+    dates = pd.to_datetime(pd.read_csv(FEAR_GREED_PATH)['date']).sort_values()
+    steps = dates.diff().dt.days
+    assert gaps['missing_days'].sum() == int((steps[steps > 1] - 1).sum())
+    unmatched = analyzer.validation_report['unmatched_trade_dates']
+    assert set(unmatched) == set(analyzer.daily_metrics['date']) - set(dates)
+
+def test_dedup_skipped_without_fill_identity_columns(tmp_path, capsys):
+    fills = make_fills(1000, seed=6).drop(columns=['Transaction Hash', 'Order ID', 'Trade ID'])
+    analyzer = run_preprocess(tmp_path, fills)
+    report = analyzer.validation_report['historical']
+    assert report['dedup_skipped']
+    assert report['dedup_key'] == []
+    assert report['duplicate_fills_dropped'] == 0
+    assert len(analyzer.historical_data) == len(fills)
+    assert 'not deduplicated' in capsys.readouterr().out